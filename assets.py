@@ -0,0 +1,177 @@
+# ----------------------------------------------------------------------------#
+# Static assets.
+# ----------------------------------------------------------------------------#
+# "flask assets build" concatenates and minifies the stylesheets and scripts
+# of layouts/main.html into one file per bundle, named after the hash of its
+# content (static/dist/main.3f9c2e1a.css), next to a gzip and, when the brotli
+# package is installed, a brotli variant. static/dist/manifest.json maps the
+# bundle names to the built files.
+#
+# The templates link the bundles with asset_urls("main.css"): the built file
+# when there is a manifest, the source files otherwise (development). The
+# built files are served with their precompressed variant and as immutable,
+# a new build gives them new names.
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+
+import click
+from flask import current_app, request, send_from_directory, url_for
+from flask.cli import with_appcontext
+
+try:
+    # optional, brotli variants are only built when it is installed
+    import brotli
+except ImportError:
+    brotli = None
+
+# bundle name: files of static/ it is made of, in order
+BUNDLES = {
+    "main.css": (
+        "css/bootstrap.min.css",
+        "css/layout.main.css",
+        "css/main.css",
+        "css/main.responsive.css",
+        "css/main.quickfix.css",
+    ),
+    "head.js": ("js/libs/modernizr-2.8.2.min.js", "js/libs/moment.min.js"),
+    # deferred by the layout, js/script.js first as when it was linked in the
+    # head with defer
+    "footer.js": ("js/script.js", "js/libs/bootstrap-3.1.1.min.js", "js/plugins.js",),
+}
+DIST = "dist"
+MANIFEST = "manifest.json"
+# Content-Encoding of each precompressed variant, by order of preference
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+# the built files never change, their name does
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def minify_css(css):
+    """
+  Drop the comments (except the /*! license */ ones) and the whitespace that
+  doesn't separate words
+  """
+    css = re.sub(r"/\*(?!!).*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r" ?([{};,>]) ?", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+def minify_js(js):
+    """
+  Scripts are only trimmed, the libraries are already minified and rewriting
+  the rest needs a real JavaScript parser
+  """
+    return "\n".join(line.rstrip() for line in js.strip().splitlines())
+
+
+def build_bundle(static_folder, name, sources):
+    """
+  Write the bundle and its compressed variants, return its path in static/
+  """
+    minify = minify_css if name.endswith(".css") else minify_js
+    separator = "\n" if name.endswith(".css") else ";\n"
+    contents = []
+    for source in sources:
+        with open(os.path.join(static_folder, source), encoding="utf-8") as file:
+            contents.append(minify(file.read()))
+    data = (separator.join(contents) + "\n").encode("utf-8")
+    stem, extension = os.path.splitext(name)
+    filename = "{0}/{1}.{2}{3}".format(
+        DIST, stem, hashlib.sha1(data).hexdigest()[:8], extension
+    )
+    path = os.path.join(static_folder, filename)
+    with open(path, "wb") as file:
+        file.write(data)
+    with open(path + ".gz", "wb") as file:
+        file.write(gzip.compress(data, 9))
+    if brotli is not None:
+        with open(path + ".br", "wb") as file:
+            file.write(brotli.compress(data, quality=11))
+    return filename
+
+
+def build(static_folder):
+    """
+  Build every bundle, replace the manifest and return it. The files of the
+  previous builds are left in place for the pages still referencing them
+  """
+    os.makedirs(os.path.join(static_folder, DIST), exist_ok=True)
+    manifest = {
+        name: build_bundle(static_folder, name, sources)
+        for name, sources in BUNDLES.items()
+    }
+    with open(os.path.join(static_folder, DIST, MANIFEST), "w") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    return manifest
+
+
+class Assets(object):
+    def init_app(self, app):
+        manifest_path = os.path.join(app.static_folder, DIST, MANIFEST)
+        manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as file:
+                manifest = json.load(file)
+        app.extensions["assets"] = manifest
+        app.jinja_env.globals["asset_urls"] = asset_urls
+        # more specific than the /static/<path:filename> rule, so it wins
+        app.add_url_rule(
+            app.static_url_path + "/" + DIST + "/<path:filename>",
+            "dist",
+            serve_built_asset,
+        )
+
+
+def asset_urls(name):
+    """
+  URLs to link for the bundle: the built file, or its sources when the
+  assets were not built
+  """
+    manifest = current_app.extensions["assets"]
+    if name in manifest:
+        return [url_for("static", filename=manifest[name])]
+    return [url_for("static", filename=source) for source in BUNDLES[name]]
+
+
+def serve_built_asset(filename):
+    static_folder = os.path.join(current_app.static_folder, DIST)
+    response = None
+    for encoding, suffix in ENCODINGS:
+        if encoding in request.accept_encodings and os.path.exists(
+            os.path.join(static_folder, filename + suffix)
+        ):
+            response = send_from_directory(
+                static_folder, filename + suffix, conditional=True
+            )
+            # the type of the original file, not of the compressed one
+            response.mimetype = mimetypes.guess_type(filename)[0]
+            response.headers["Content-Encoding"] = encoding
+            break
+    if response is None:
+        response = send_from_directory(static_folder, filename, conditional=True)
+    response.headers["Cache-Control"] = IMMUTABLE
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+@click.group("assets")
+def assets_cli():
+    """
+  Static assets build
+  """
+
+
+@assets_cli.command("build")
+@with_appcontext
+def build_command():
+    """
+  Bundle, minify and compress the stylesheets and scripts
+  """
+    for name, filename in sorted(build(current_app.static_folder).items()):
+        click.echo("{0} -> {1}".format(name, filename))
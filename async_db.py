@@ -0,0 +1,137 @@
+# ----------------------------------------------------------------------------#
+# Async database access.
+# ----------------------------------------------------------------------------#
+# With ASYNC_VIEWS the venue and artist pages are served by async views which
+# run their independent queries (the row, its genres, its past and upcoming
+# shows) concurrently, each on its own connection of an AsyncEngine: asyncpg
+# for PostgreSQL, aiosqlite for SQLite, and "flask[async]" for the views.
+#
+# Flask runs every async view in an event loop of its own, which a pooled
+# connection can't outlive, and a connection opened per query costs a connect
+# (4 per page). The engine is therefore owned by one event loop per process,
+# run forever by a daemon thread, where the views hand their queries: its pool
+# keeps the connections open across requests. On PostgreSQL the pool settings
+# are the DB_* ones of config.py, with DB_PGBOUNCER the statement caches of
+# asyncpg are disabled. The loop thread has no app context, so the queries are
+# timed there and counted in the metrics of the request by fetch_all().
+#
+# benchmarks/bench_async_pages.py compares both modes. On SQLite, where a query
+# doesn't wait on the network, the async pages are slower than the synchronous
+# ones (about 135 against 240 pages/s with 8 threads): ASYNC_VIEWS only pays
+# off once the database round trips outweigh the event loop of every view.
+
+import asyncio
+import contextvars
+import os
+import time
+from threading import Lock, Thread
+
+from flask import current_app
+from sqlalchemy.engine import make_url
+
+from config import engine_options
+from metrics import record_query
+
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def async_engine_options(config):
+    """
+  Options of the AsyncEngine: the pool of engine_options() in config.py, with
+  the asyncpg equivalents of its connect_args
+  """
+    options = engine_options(config)
+    if not config["SQLALCHEMY_DATABASE_URI"].startswith("postgres"):
+        return options
+    connect_args = {}
+    if config["DB_STATEMENT_TIMEOUT"]:
+        connect_args["server_settings"] = {
+            "statement_timeout": str(config["DB_STATEMENT_TIMEOUT"])
+        }
+    if config["DB_PGBOUNCER"]:
+        # prepared statements don't survive the transaction pooling of PgBouncer
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+    options["connect_args"] = connect_args
+    return options
+
+
+class EventLoopEngine(object):
+    """
+  AsyncEngine of one application and the event loop running its queries,
+  started in the process on its first query: the thread of a gunicorn master
+  doesn't survive the fork of its workers
+  """
+
+    def __init__(self, url, options):
+        self.url = url
+        self.options = options
+        self.lock = Lock()
+        self.pid = None
+        self.loop = None
+        self.engine = None
+
+    def start(self):
+        # imported here, the async drivers are only needed with ASYNC_VIEWS
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.loop = asyncio.new_event_loop()
+            Thread(target=self.loop.run_forever, name="async-db", daemon=True).start()
+            self.engine = create_async_engine(self.url, **self.options)
+            self.pid = os.getpid()
+
+    async def fetch(self, statement):
+        """
+  Rows of the statement, with the SQL run and its duration: the loop thread
+  has no app context for metrics.py to see them
+  """
+        async with self.engine.connect() as connection:
+            start = time.perf_counter()
+            result = await connection.execute(statement)
+            elapsed = time.perf_counter() - start
+            return result.all(), result.context.statement, elapsed
+
+    async def gather(self, statements):
+        return await asyncio.gather(
+            *(self.fetch(statement) for statement in statements)
+        )
+
+    async def fetch_all(self, statements):
+        """
+  Rows of each statement, run concurrently on the loop of the engine and
+  awaited from the loop of the view
+  """
+        self.start()
+        # in an empty context: the task would otherwise get a copy of the one
+        # of the view, and the cursor events of metrics.py would update its g
+        # from the loop thread
+        future = contextvars.Context().run(
+            asyncio.run_coroutine_threadsafe, self.gather(statements), self.loop
+        )
+        return await asyncio.wrap_future(future)
+
+
+class AsyncDatabase(object):
+    def init_app(self, app):
+        url = make_url(app.config["SQLALCHEMY_DATABASE_URI"])
+        backend = url.get_backend_name()
+        if backend not in ASYNC_DRIVERS:
+            raise RuntimeError("ASYNC_VIEWS doesn't support {0}".format(backend))
+        url = url.set(drivername="{0}+{1}".format(backend, ASYNC_DRIVERS[backend]))
+        app.extensions["async_db"] = EventLoopEngine(
+            url, async_engine_options(app.config)
+        )
+
+    async def fetch_all(self, *statements):
+        """
+  Rows of each statement, the statements run concurrently. They are counted
+  in the metrics of the request, with their durations summed although they
+  overlap
+  """
+        results = await current_app.extensions["async_db"].fetch_all(statements)
+        for _, sql, elapsed in results:
+            record_query(sql, elapsed)
+        return [rows for rows, _, _ in results]
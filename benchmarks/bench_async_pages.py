@@ -0,0 +1,102 @@
+"""
+Benchmark of the venue and artist pages, synchronous and with ASYNC_VIEWS.
+
+Requests the detail pages from several threads at once against a temporary
+SQLite database, once with the synchronous views and once with the async
+views, and reports per mode the database connections opened per page, the
+throughput and the p50 and p95 latencies.
+
+    $ python -m benchmarks.bench_async_pages --threads 8 --pages 100
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+
+from app import create_app
+from benchmarks.bench_create_submissions import percentile
+from models import db
+from seed import seed
+
+
+def main(threads=8, pages=100, entities=100, shows=5000):
+    path = os.path.join(tempfile.mkdtemp(prefix="fyyur-bench-"), "bench.db")
+    uri = "sqlite:///" + path
+
+    print(
+        "{0:<6} {1:>12} {2:>9} {3:>9} {4:>9} {5:>8}".format(
+            "mode", "connections", "pages/s", "p50 ms", "p95 ms", "errors"
+        )
+    )
+    for mode in ("sync", "async"):
+        app = create_app(
+            SQLALCHEMY_DATABASE_URI=uri,
+            PAGE_CACHE_BACKEND="null",
+            ASYNC_VIEWS=mode == "async",
+        )
+        with app.app_context():
+            if mode == "sync":
+                db.create_all()
+                seed(entities, entities, shows)
+
+        connections = [0]
+        lock = threading.Lock()
+
+        def count_connection(*args):
+            with lock:
+                connections[0] += 1
+
+        # the async engine is created on the first page, count every pool
+        event.listen(Pool, "connect", count_connection)
+        latencies = []
+        errors = []
+
+        def get_pages(thread):
+            client = app.test_client()
+            for page in range(pages):
+                index = thread * pages + page
+                url = "/{0}/{1}".format(
+                    "venues" if index % 2 else "artists", 1 + index % entities
+                )
+                start = time.perf_counter()
+                response = client.get(url)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors.append(url)
+
+        workers = [
+            threading.Thread(target=get_pages, args=(thread,))
+            for thread in range(threads)
+        ]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+        event.remove(Pool, "connect", count_connection)
+        print(
+            "{0:<6} {1:>12.2f} {2:>9.0f} {3:>9.2f} {4:>9.2f} {5:>8}".format(
+                mode,
+                connections[0] / float(len(latencies)),
+                len(latencies) / elapsed,
+                percentile(latencies, 0.5) * 1000,
+                percentile(latencies, 0.95) * 1000,
+                len(errors),
+            )
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--entities", type=int, default=100)
+    parser.add_argument("--shows", type=int, default=5000)
+    args = parser.parse_args()
+    main(args.threads, args.pages, args.entities, args.shows)
@@ -0,0 +1,144 @@
+"""
+Benchmark of the create form posts under concurrency.
+
+Posts the venue, artist and show creation forms from several threads at once
+against a temporary SQLite database and reports, per form, the number of SQL
+statements a post costs, the throughput and the p95 latency.
+
+    $ python -m benchmarks.bench_create_submissions --threads 8 --posts 50
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app import create_app
+from models import db
+from seed import seed
+
+FORMS = {
+    "venue": (
+        "/venues/create",
+        {
+            "name": "Benchmark Venue {index}",
+            "city": "San Francisco",
+            "state": "CA",
+            "address": "1 Market St",
+            "phone": "123-123-1234",
+            "image_link": "",
+            "facebook_link": "https://www.facebook.com/bench",
+            "genres": "Jazz",
+            "website": "https://bench.example.com",
+            "seeking_description": "",
+        },
+    ),
+    "artist": (
+        "/artists/create",
+        {
+            "name": "Benchmark Artist {index}",
+            "city": "San Francisco",
+            "state": "CA",
+            "phone": "123-123-1234",
+            "image_link": "",
+            "facebook_link": "https://www.facebook.com/bench",
+            "genres": "Jazz",
+            "website": "https://bench.example.com",
+            "seeking_description": "",
+        },
+    ),
+    "show": (
+        "/shows/create",
+        {"artist_id": "{artist_id}", "venue_id": "{venue_id}", "start_time": None},
+    ),
+}
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def main(threads=8, posts=50, entities=100):
+    path = os.path.join(tempfile.mkdtemp(prefix="fyyur-bench-"), "bench.db")
+    app = create_app(
+        SQLALCHEMY_DATABASE_URI="sqlite:///" + path,
+        WTF_CSRF_ENABLED=False,
+        PAGE_CACHE_BACKEND="null",
+    )
+    with app.app_context():
+        db.create_all()
+        seed(entities, entities, entities)
+        engine = db.engine
+
+    counts = threading.local()
+
+    def count_statement(*args):
+        counts.statements = getattr(counts, "statements", 0) + 1
+
+    event.listen(engine, "before_cursor_execute", count_statement)
+    start_time = (datetime.now() + timedelta(days=30)).strftime("%Y-%m-%d %H:%M:%S")
+
+    print(
+        "{0:<8} {1:>11} {2:>9} {3:>9} {4:>8}".format(
+            "form", "statements", "posts/s", "p95 ms", "errors"
+        )
+    )
+    for name, (url, data) in FORMS.items():
+        statements = []
+        latencies = []
+        errors = []
+
+        def post_forms(thread):
+            client = app.test_client()
+            for post in range(posts):
+                index = thread * posts + post
+                form = {
+                    key: (value or start_time).format(
+                        index=index,
+                        venue_id=1 + index % entities,
+                        artist_id=1 + index % entities,
+                    )
+                    for key, value in data.items()
+                }
+                counts.statements = 0
+                start = time.perf_counter()
+                response = client.post(url, data=form)
+                latencies.append(time.perf_counter() - start)
+                statements.append(counts.statements)
+                if b"successfully listed" not in response.data:
+                    errors.append(index)
+
+        workers = [
+            threading.Thread(target=post_forms, args=(thread,))
+            for thread in range(threads)
+        ]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+        print(
+            "{0:<8} {1:>11.1f} {2:>9.0f} {3:>9.2f} {4:>8}".format(
+                name,
+                sum(statements) / float(len(statements)),
+                len(latencies) / elapsed,
+                percentile(latencies, 0.95) * 1000,
+                len(errors),
+            )
+        )
+    event.remove(engine, "before_cursor_execute", count_statement)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--posts", type=int, default=50)
+    parser.add_argument("--entities", type=int, default=100)
+    args = parser.parse_args()
+    main(args.threads, args.posts, args.entities)
@@ -0,0 +1,54 @@
+"""
+Micro-benchmark of the "datetime" template filter.
+
+Compares the previous implementation (dateutil parsing of an ISO string and
+babel.dates.format_datetime on every call) with helpers.format_datetime on
+datetime objects, cold (every value distinct) and warm (a shows page, where
+many tiles share the same start time).
+
+    $ python -m benchmarks.bench_datetime_filter
+"""
+
+import timeit
+from datetime import datetime, timedelta
+
+import babel.dates
+import dateutil.parser
+
+from helpers import DATETIME_FORMATS, _format_datetime, format_datetime
+
+
+def previous_format_datetime(value, format="medium"):
+    date = dateutil.parser.parse(value)
+    format = DATETIME_FORMATS.get(format, format)
+    return babel.dates.format_datetime(date, format)
+
+
+def main(calls=20000, distinct_times=200):
+    start = datetime(2030, 1, 1, 20, 0)
+    distinct = [start + timedelta(minutes=index) for index in range(calls)]
+    repeated = [
+        start + timedelta(days=index % distinct_times) for index in range(calls)
+    ]
+    assert format_datetime(start, "full") == previous_format_datetime(
+        start.isoformat(), "full"
+    )
+
+    def run(label, function, values):
+        _format_datetime.cache_clear()
+        seconds = timeit.timeit(
+            lambda: [function(value, "full") for value in values], number=1
+        )
+        print("{0:<40} {1:8.2f} us/call".format(label, seconds / len(values) * 1e6))
+
+    run(
+        "previous (ISO string)",
+        previous_format_datetime,
+        [v.isoformat() for v in repeated],
+    )
+    run("format_datetime, distinct datetimes", format_datetime, distinct)
+    run("format_datetime, shows page datetimes", format_datetime, repeated)
+
+
+if __name__ == "__main__":
+    main()
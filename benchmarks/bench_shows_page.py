@@ -0,0 +1,81 @@
+"""
+Memory benchmark of a large shows page.
+
+Seeds a temporary SQLite database, then builds and renders one page of the
+shows listing far larger than SHOWS_MAX_PAGE_SIZE allows and reports, for
+building the rows alone and for the rendered page, the memory blocks and
+KiB the result holds and the peak memory traced by tracemalloc.
+
+    $ python -m benchmarks.bench_shows_page --rows 10000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from flask import render_template
+
+from app import create_app
+from models import db
+import queries
+from seed import seed
+
+
+def traced(function):
+    """
+  Run the function under tracemalloc, return the number of memory blocks and
+  the KiB its result holds, the peak KiB and the seconds it took
+  """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    held, peak = tracemalloc.get_traced_memory()
+    blocks = sum(
+        stat.count for stat in tracemalloc.take_snapshot().statistics("filename")
+    )
+    tracemalloc.stop()
+    del result
+    return blocks, held / 1024.0, peak / 1024.0, elapsed
+
+
+def main(rows=10000):
+    path = os.path.join(tempfile.mkdtemp(prefix="fyyur-bench-"), "bench.db")
+    app = create_app(SQLALCHEMY_DATABASE_URI="sqlite:///" + path)
+    with app.app_context():
+        db.create_all()
+        seed(rows // 10, rows // 10, rows)
+
+    print(
+        "{0:<8} {1:>9} {2:>11} {3:>11} {4:>9}".format(
+            "step", "blocks", "held KiB", "peak KiB", "ms"
+        )
+    )
+    steps = (
+        ("rows", lambda: list(queries.ShowsPage(rows))),
+        (
+            "render",
+            lambda: render_template(
+                "pages/shows.html", shows=list(queries.ShowsPage(rows)), page=None
+            ),
+        ),
+    )
+    for name, step in steps:
+        with app.test_request_context("/shows"):
+            # first run outside of the measure: compiled template, query cache
+            step()
+            blocks, held, peak, elapsed = traced(step)
+        print(
+            "{0:<8} {1:>9} {2:>11.1f} {3:>11.1f} {4:>9.1f}".format(
+                name, blocks, held, peak, elapsed * 1000
+            )
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    args = parser.parse_args()
+    main(args.rows)
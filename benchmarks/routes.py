@@ -0,0 +1,390 @@
+"""
+Benchmark of every route of the application.
+
+Seeds a throwaway database with the given volumes of venues, artists and
+shows (see seed.py), requests every route through the Flask test client and reports per
+route the p50/p95 latency, the number of SQL queries and the peak memory
+allocated while handling the request. The results can be saved as a JSON
+baseline with the volumes and iterations they were measured with. A later run
+with the same parameters fails when a route runs more queries than in the
+baseline; a route slower than the baseline by more than the threshold is only
+reported, as the latencies depend on the machine, unless --fail-on-latency.
+
+    $ python -m benchmarks.routes --update-baseline
+    $ python -m benchmarks.routes --venues 5000 --shows 100000
+    $ python -m benchmarks.routes --database-url postgresql://localhost/fyyur_bench
+
+The database given with --database-url is wiped, never point it to real data.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from app import create_app
+from assets import build
+from models import db
+from seed import seed
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# (name, method, path, data), the path and the form data may use {venue_id},
+# {artist_id}, {deleted_venue_id} and {iteration} which are filled for every
+# request; data given as a string is sent as the raw request body
+ROUTES = (
+    ("index", "GET", "/", None),
+    ("venues", "GET", "/venues", None),
+    ("venues_by_genre", "GET", "/venues?genre=Jazz", None),
+    ("show_venue", "GET", "/venues/{venue_id}", None),
+    ("search_venues", "POST", "/venues/search", {"search_term": "the"}),
+    ("create_venue_form", "GET", "/venues/create", None),
+    (
+        "create_venue_submission",
+        "POST",
+        "/venues/create",
+        {
+            "name": "Benchmark Venue",
+            "city": "San Francisco",
+            "state": "CA",
+            "address": "1 Market St",
+            "phone": "123-123-1234",
+            "image_link": "",
+            "facebook_link": "https://www.facebook.com/bench",
+            "genres": "Jazz",
+            "website": "https://bench.example.com",
+            "seeking_description": "",
+        },
+    ),
+    ("edit_venue", "GET", "/venues/{venue_id}/edit", None),
+    (
+        "edit_venue_submission",
+        "POST",
+        "/venues/{venue_id}/edit",
+        {
+            "name": "Edited Venue",
+            "city": "San Francisco",
+            "state": "CA",
+            "address": "1 Market St",
+            "phone": "123-123-1234",
+            "image_link": "",
+            "facebook_link": "https://www.facebook.com/bench",
+            "genres": "Jazz",
+            "website": "https://bench.example.com",
+            "seeking_description": "",
+        },
+    ),
+    ("delete_venue", "DELETE", "/venues/{deleted_venue_id}", None),
+    ("artists", "GET", "/artists", None),
+    ("show_artist", "GET", "/artists/{artist_id}", None),
+    ("search_artists", "POST", "/artists/search", {"search_term": "band"}),
+    ("create_artist_form", "GET", "/artists/create", None),
+    (
+        "create_artist_submission",
+        "POST",
+        "/artists/create",
+        {
+            "name": "Benchmark Artist",
+            "city": "San Francisco",
+            "state": "CA",
+            "phone": "123-123-1234",
+            "image_link": "",
+            "facebook_link": "https://www.facebook.com/bench",
+            "genres": "Jazz",
+            "website": "https://bench.example.com",
+            "seeking_description": "",
+        },
+    ),
+    ("edit_artist", "GET", "/artists/{artist_id}/edit", None),
+    (
+        "edit_artist_submission",
+        "POST",
+        "/artists/{artist_id}/edit",
+        {
+            "name": "Edited Artist",
+            "city": "San Francisco",
+            "state": "CA",
+            "phone": "123-123-1234",
+            "image_link": "",
+            "facebook_link": "https://www.facebook.com/bench",
+            "genres": "Jazz",
+            "website": "https://bench.example.com",
+            "seeking_description": "",
+        },
+    ),
+    ("shows", "GET", "/shows", None),
+    ("shows_streamed", "GET", "/shows?stream=1", None),
+    ("create_shows", "GET", "/shows/create", None),
+    (
+        "create_show_submission",
+        "POST",
+        "/shows/create",
+        {
+            "artist_id": "{artist_id}",
+            "venue_id": "{venue_id}",
+            "start_time": "2035-01-01 20:00:00",
+        },
+    ),
+    (
+        "import_shows_submission",
+        "POST",
+        "/shows/import?format=csv",
+        "artist_id,venue_id,start_time\n"
+        "{artist_id},{venue_id},2035-01-0{venue_id} 20:00:00\n",
+    ),
+    ("api_venues", "GET", "/api/v1/venues", None),
+    ("api_venue", "GET", "/api/v1/venues/{venue_id}", None),
+    ("api_artists", "GET", "/api/v1/artists?fields=id,name", None),
+    ("api_artist", "GET", "/api/v1/artists/{artist_id}", None),
+    ("api_shows", "GET", "/api/v1/shows", None),
+    ("api_timeline", "GET", "/api/v1/timeline?city=New York&state=NY", None),
+    ("api_search", "GET", "/api/v1/search/venues?search_term=the", None),
+    ("pool_stats", "GET", "/stats/pool", None),
+    ("metrics", "GET", "/metrics", None),
+    ("dist", "GET", "/static/dist/manifest.json", None),
+)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def request_args(path, data, run, venues):
+    ids = {
+        "venue_id": 1 + run % 9,
+        "artist_id": 1 + run % 9,
+        # every run deletes another venue, taken from the end of the table
+        "deleted_venue_id": venues - run,
+        "iteration": run,
+    }
+    if isinstance(data, str):
+        data = data.format(**ids)
+    elif data:
+        data = {key: value.format(**ids) for key, value in data.items()}
+    return path.format(**ids), data
+
+
+def benchmark(app, routes, iterations, venues):
+    """
+  Request every route iterations times. The first request of a route warms
+  the template and statement caches and isn't measured, the memory peak is
+  taken by one more request traced by tracemalloc so that the tracing
+  doesn't skew the latencies
+  """
+    client = app.test_client()
+    query_count = [0]
+    request_thread = threading.get_ident()
+
+    def count_query(*args):
+        # the queries of the background jobs (see jobs.py) run on their threads
+        if threading.get_ident() == request_thread:
+            query_count[0] += 1
+
+    def run_request(method, path, data, run):
+        url, data = request_args(path, data, run, venues)
+        response = client.open(url, method=method, data=data)
+        response.get_data()
+        if response.status_code >= 400:
+            raise RuntimeError(
+                "{0} {1} answered {2}".format(method, url, response.status_code)
+            )
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", count_query)
+    results = {}
+    try:
+        for name, method, path, data in routes:
+            run_request(method, path, data, 0)
+            latencies = []
+            queries = []
+            for run in range(1, iterations + 1):
+                query_count[0] = 0
+                start = time.perf_counter()
+                run_request(method, path, data, run)
+                latencies.append(time.perf_counter() - start)
+                queries.append(query_count[0])
+            tracemalloc.start()
+            run_request(method, path, data, iterations + 1)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            results[name] = {
+                "p50_ms": round(percentile(latencies, 0.5) * 1000, 3),
+                "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+                "queries": max(queries),
+                "peak_kib": round(peak / 1024.0, 1),
+            }
+    finally:
+        event.remove(engine, "before_cursor_execute", count_query)
+    return results
+
+
+def untested_routes(app):
+    """
+  Endpoints of the application missing from ROUTES
+  """
+    tested = set()
+    adapter = app.url_map.bind("localhost")
+    for _, method, path, _ in ROUTES:
+        url = request_args(path, None, 0, 1)[0].split("?")[0]
+        tested.add(adapter.match(url, method=method)[0])
+    return sorted(
+        rule.endpoint
+        for rule in app.url_map.iter_rules()
+        if rule.endpoint not in tested and rule.endpoint != "static"
+    )
+
+
+def compare(results, baseline, threshold, slack_ms=1.0):
+    """
+  Differences of the route results against the baseline ones, as two lists:
+  the routes running more queries, and the routes whose p95 latency is above
+  the baseline by more than threshold (a fraction) plus slack_ms, so that the
+  noise of the sub-millisecond routes isn't reported
+  """
+    queries = []
+    latencies = []
+    for name, result in sorted(results.items()):
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if result["queries"] > expected["queries"]:
+            queries.append(
+                "{0}: {1} queries, baseline {2}".format(
+                    name, result["queries"], expected["queries"]
+                )
+            )
+        if result["p95_ms"] > expected["p95_ms"] * (1 + threshold) + slack_ms:
+            latencies.append(
+                "{0}: p95 {1}ms, baseline {2}ms".format(
+                    name, result["p95_ms"], expected["p95_ms"]
+                )
+            )
+    return queries, latencies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", help="wiped! default: temporary SQLite")
+    parser.add_argument("--venues", type=int, default=500)
+    parser.add_argument("--artists", type=int, default=500)
+    parser.add_argument("--shows", type=int, default=5000)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.5,
+        help="allowed p95 slowdown over the baseline (0.5 = 50%%)",
+    )
+    parser.add_argument(
+        "--slack-ms",
+        type=float,
+        default=1.0,
+        help="allowed p95 slowdown in milliseconds, on top of the threshold",
+    )
+    parser.add_argument(
+        "--fail-on-latency",
+        action="store_true",
+        help="fail on a p95 slowdown too, not only on more queries",
+    )
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+    parameters = {
+        "venues": args.venues,
+        "artists": args.artists,
+        "shows": args.shows,
+        "iterations": args.iterations,
+    }
+
+    database_url = args.database_url
+    if database_url is None:
+        database_url = "sqlite:///" + os.path.join(
+            tempfile.mkdtemp(prefix="fyyur-bench-"), "bench.db"
+        )
+    parameters["database"] = make_url(database_url).get_backend_name()
+
+    baseline = None
+    if not args.update_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        # the numbers of other volumes or another database can't be compared
+        if baseline.get("parameters") != parameters:
+            print(
+                "error: {0} was measured with {1}, this run with {2}, run it with "
+                "the same parameters or --update-baseline".format(
+                    args.baseline, baseline.get("parameters"), parameters
+                )
+            )
+            return 2
+
+    app = create_app(
+        SQLALCHEMY_DATABASE_URI=database_url,
+        WTF_CSRF_ENABLED=False,
+        # measure the rendering itself, not the page cache
+        PAGE_CACHE_BACKEND="null",
+    )
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        seed(args.venues, args.artists, args.shows)
+    # served by the dist route, see assets.py
+    build(app.static_folder)
+
+    missing = untested_routes(app)
+    if missing:
+        print("warning: routes not benchmarked: " + ", ".join(missing))
+    results = benchmark(app, ROUTES, args.iterations, args.venues)
+
+    print(
+        "{0:<26} {1:>9} {2:>9} {3:>8} {4:>10}".format(
+            "route", "p50 ms", "p95 ms", "queries", "peak KiB"
+        )
+    )
+    for name, result in results.items():
+        print(
+            "{0:<26} {p50_ms:>9} {p95_ms:>9} {queries:>8} {peak_kib:>10}".format(
+                name, **result
+            )
+        )
+    document = {"parameters": parameters, "routes": results}
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(document, output, indent=2, sort_keys=True)
+    if args.update_baseline:
+        with open(args.baseline, "w") as output:
+            json.dump(document, output, indent=2, sort_keys=True)
+        print("baseline written to " + args.baseline)
+        return 0
+    if baseline is None:
+        return 0
+    queries, latencies = compare(
+        results, baseline["routes"], args.threshold, args.slack_ms
+    )
+    if latencies:
+        print(
+            "{0} against {1}".format(
+                "regressions" if args.fail_on_latency else "slower (advisory)",
+                args.baseline,
+            )
+        )
+        for latency in latencies:
+            print("  " + latency)
+    if queries:
+        print("query regressions against " + args.baseline)
+        for query in queries:
+            print("  " + query)
+    return 1 if queries or (latencies and args.fail_on_latency) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
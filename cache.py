@@ -0,0 +1,215 @@
+# ----------------------------------------------------------------------------#
+# Page cache.
+# ----------------------------------------------------------------------------#
+# Read-through cache of the rendered venue and artist pages. A page is rendered
+# once, stored with its ETag and served from the cache until a write controller
+# invalidates it (or its TTL expires, which bounds how long a show can stay
+# listed as upcoming after it started).
+#
+# The in-process LRU backend is private to each worker: an invalidation would
+# only reach the worker which handled the write, so it is refused with more
+# than one worker, use the Redis backend there.
+
+import hashlib
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from flask import current_app, make_response, request, session
+
+from models import db, Show
+
+
+class NullCache(object):
+    """
+  Backend used when the cache is disabled
+  """
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+    def delete(self, *keys):
+        pass
+
+
+class LRUCache(object):
+    """
+  In-process cache bounded to max_entries, the least recently used entry is
+  evicted first and entries expire ttl seconds after being stored
+  """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, *keys):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+
+class RedisCache(object):
+    """
+  Backend storing the pages in Redis. client is anything with the get, setex
+  and delete methods of redis.Redis (e.g. a fake in the tests)
+  """
+
+    def __init__(self, client, prefix="fyyur:page:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        if value is None:
+            return None
+        etag, _, body = value.partition(b"\n")
+        return etag.decode(), body.decode("utf-8")
+
+    def set(self, key, value, ttl):
+        etag, body = value
+        self.client.setex(
+            self.prefix + key, ttl, etag.encode() + b"\n" + body.encode("utf-8")
+        )
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+
+
+def page_key(kind, entity_id):
+    return "{0}:{1}".format(kind, entity_id)
+
+
+def fragment_key(key):
+    """
+  Key of a {% cache %} fragment, see templating.py
+  """
+    return "fragment:{0}".format(key)
+
+
+class PageCache(object):
+    """
+  Flask extension caching the rendered detail pages, configured with
+  PAGE_CACHE_BACKEND ("lru", "redis" or "null"), PAGE_CACHE_TTL,
+  PAGE_CACHE_MAX_ENTRIES and PAGE_CACHE_REDIS_URL. The backend of each
+  application is kept in its extensions
+  """
+
+    def init_app(self, app, redis_client=None):
+        app.extensions["page_cache"] = self.create_backend(app, redis_client)
+
+    def create_backend(self, app, redis_client):
+        backend = app.config["PAGE_CACHE_BACKEND"]
+        if backend == "lru":
+            if app.config["WEB_WORKERS"] > 1:
+                raise RuntimeError(
+                    "PAGE_CACHE_BACKEND lru can't be shared by {0} workers, "
+                    "use redis".format(app.config["WEB_WORKERS"])
+                )
+            return LRUCache(app.config["PAGE_CACHE_MAX_ENTRIES"])
+        elif backend == "redis":
+            if redis_client is None:
+                # optional dependency, only needed with the redis backend
+                import redis
+
+                redis_client = redis.from_url(app.config["PAGE_CACHE_REDIS_URL"])
+            return RedisCache(redis_client)
+        return NullCache()
+
+    @property
+    def backend(self):
+        return current_app.extensions["page_cache"]
+
+    def respond(self, kind, entity_id, render):
+        """
+  Response for the page of the given entity, render() is only called on a
+  cache miss. Answers 304 when the client already has the current version
+  """
+        key, cacheable, cached = self.lookup(kind, entity_id)
+        if cached is None:
+            cached = self.store(key, render(), cacheable)
+        return self.conditional_response(*cached)
+
+    async def respond_async(self, kind, entity_id, render):
+        """
+  respond() for the async views, render is a coroutine function
+  """
+        key, cacheable, cached = self.lookup(kind, entity_id)
+        if cached is None:
+            cached = self.store(key, await render(), cacheable)
+        return self.conditional_response(*cached)
+
+    def lookup(self, kind, entity_id):
+        key = page_key(kind, entity_id)
+        # a pending flash message is part of the page, don't serve or store it
+        cacheable = "_flashes" not in session
+        return key, cacheable, self.backend.get(key) if cacheable else None
+
+    def store(self, key, body, cacheable, ttl=None):
+        etag = hashlib.sha1(body.encode("utf-8")).hexdigest()
+        if cacheable:
+            if ttl is None:
+                ttl = current_app.config["PAGE_CACHE_TTL"]
+            self.backend.set(key, (etag, body), ttl)
+        return etag, body
+
+    def conditional_response(self, etag, body):
+        response = make_response(body)
+        response.set_etag(etag)
+        # the browser must revalidate, which costs a 304 at most
+        response.headers["Cache-Control"] = "no-cache"
+        return response.make_conditional(request)
+
+    def invalidate(self, keys):
+        self.backend.delete(*keys)
+
+    def venue_keys(self, venue_id):
+        """
+  Keys of the pages showing the venue: its own and the artists who play there,
+  and of the venues listing
+  """
+        artist_ids = db.session.query(Show.artist_id).filter(Show.venue_id == venue_id)
+        keys = [page_key("venue", venue_id), fragment_key("venues")]
+        return keys + [
+            page_key("artist", artist_id) for artist_id, in artist_ids.distinct()
+        ]
+
+    def artist_keys(self, artist_id):
+        """
+  Keys of the pages showing the artist: its own and the venues it plays at,
+  and of the artists listing
+  """
+        venue_ids = db.session.query(Show.venue_id).filter(Show.artist_id == artist_id)
+        keys = [page_key("artist", artist_id), fragment_key("artists")]
+        return keys + [
+            page_key("venue", venue_id) for venue_id, in venue_ids.distinct()
+        ]
+
+    def show_keys(self, venue_id, artist_id):
+        """
+  Keys of the pages listing a show
+  """
+        return [page_key("venue", venue_id), page_key("artist", artist_id)]
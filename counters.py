@@ -0,0 +1,143 @@
+# ----------------------------------------------------------------------------#
+# Show counters.
+# ----------------------------------------------------------------------------#
+# Venue and Artist carry upcoming_shows_count and past_shows_count, read by
+# the listing and search pages instead of counting the shows of every row.
+# They are kept up to date in the transaction writing the shows:
+#   - record_shows() adds the new shows to the counters
+#   - recount() counts them again from the Show table, after deletes
+#   - roll_over() moves the shows that started since the last run from the
+#     upcoming to the past counters. next_show_time, the start of the next
+#     upcoming show, selects the rows that need it, so a run touches only them.
+# "flask counters roll-over" is meant to run periodically (cron, Heroku
+# scheduler), "flask counters recount" rebuilds every counter.
+
+from datetime import datetime
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import bindparam, case, func, select
+
+from models import db, Venue, Artist, Show
+
+# counted model and its Show foreign key
+MODELS = ((Venue, "venue_id"), (Artist, "artist_id"))
+
+
+def record_shows(shows, now=None):
+    """
+  Add the new shows, dicts with venue_id, artist_id and start_time, to the
+  counters of their venue and artist. One executemany UPDATE per model, the
+  caller commits
+  """
+    if now is None:
+        now = datetime.now()
+    shows = list(shows)
+    for model, foreign_key in MODELS:
+        deltas = {}
+        for show in shows:
+            delta = deltas.setdefault(
+                show[foreign_key],
+                {"_id": show[foreign_key], "_upcoming": 0, "_past": 0, "_next": None},
+            )
+            if show["start_time"] >= now:
+                delta["_upcoming"] += 1
+                if delta["_next"] is None or show["start_time"] < delta["_next"]:
+                    delta["_next"] = show["start_time"]
+            else:
+                delta["_past"] += 1
+        if not deltas:
+            continue
+        table = model.__table__
+        next_time = bindparam("_next", type_=table.c.next_show_time.type)
+        db.session.execute(
+            table.update()
+            .where(table.c.id == bindparam("_id"))
+            .values(
+                upcoming_shows_count=table.c.upcoming_shows_count
+                + bindparam("_upcoming"),
+                past_shows_count=table.c.past_shows_count + bindparam("_past"),
+                next_show_time=case(
+                    (table.c.next_show_time.is_(None), next_time),
+                    (next_time < table.c.next_show_time, next_time),
+                    else_=table.c.next_show_time,
+                ),
+            ),
+            list(deltas.values()),
+        )
+
+
+def recount(model, where=None, now=None):
+    """
+  Count again the shows of the venues or artists matching the where clause
+  (all of them by default) and return the number of rows updated
+  """
+    if now is None:
+        now = datetime.now()
+    table = model.__table__
+    shows = Show.__table__
+    foreign_key = shows.c[dict(MODELS)[model]]
+
+    def shows_of_row(*conditions):
+        return select(*conditions).where(foreign_key == table.c.id)
+
+    statement = table.update().values(
+        upcoming_shows_count=shows_of_row(func.count())
+        .where(shows.c.start_time >= now)
+        .scalar_subquery(),
+        past_shows_count=shows_of_row(func.count())
+        .where(shows.c.start_time < now)
+        .scalar_subquery(),
+        next_show_time=shows_of_row(func.min(shows.c.start_time))
+        .where(shows.c.start_time >= now)
+        .scalar_subquery(),
+    )
+    if where is not None:
+        statement = statement.where(where)
+    return db.session.execute(statement).rowcount
+
+
+def roll_over(now=None):
+    """
+  Recount the venues and artists whose next show has started, return the
+  number of rows updated per model
+  """
+    if now is None:
+        now = datetime.now()
+    return {
+        model.__tablename__: recount(model, model.next_show_time < now, now)
+        for model, _ in MODELS
+    }
+
+
+@click.group("counters")
+def counters_cli():
+    """
+  Maintenance of the upcoming/past show counters
+  """
+
+
+@counters_cli.command("roll-over")
+@with_appcontext
+def roll_over_command():
+    """
+  Move the shows started since the last run to the past counters
+  """
+    updated = roll_over()
+    db.session.commit()
+    click.echo(
+        ", ".join(
+            "{0}: {1} updated".format(name, rows) for name, rows in updated.items()
+        )
+    )
+
+
+@counters_cli.command("recount")
+@with_appcontext
+def recount_command():
+    """
+  Rebuild every counter from the Show table
+  """
+    for model, _ in MODELS:
+        click.echo("{0}: {1} updated".format(model.__tablename__, recount(model)))
+    db.session.commit()
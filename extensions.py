@@ -0,0 +1,15 @@
+from flask_migrate import Migrate
+from flask_moment import Moment
+
+from assets import Assets
+from async_db import AsyncDatabase
+from cache import PageCache
+from metrics import Metrics
+
+# the extensions are bound to the application in create_app()
+moment = Moment()
+migrate = Migrate()  # migrations instantiation
+page_cache = PageCache()
+assets = Assets()
+metrics = Metrics()
+async_db = AsyncDatabase()  # only bound with ASYNC_VIEWS
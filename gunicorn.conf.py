@@ -0,0 +1,13 @@
+# gunicorn -c gunicorn.conf.py "app:create_app()"
+import multiprocessing
+import os
+
+# build the application once in the master, the workers are forked from it
+# and share the loaded modules and the compiled templates copy-on-write
+preload_app = True
+os.environ.setdefault("PRELOAD_TEMPLATES", "1")
+
+bind = os.environ.get("BIND", "0.0.0.0:{0}".format(os.environ.get("PORT", 5000)))
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+# read by config.py: a per-worker page cache is refused with several workers
+os.environ["WEB_CONCURRENCY"] = str(workers)
@@ -0,0 +1,58 @@
+import babel
+import babel.dates
+import dateutil.parser
+from datetime import datetime
+from functools import lru_cache
+
+from viewmodels import ListItem, SearchResults
+
+
+# ----------------------------------------------------------------------------#
+# Filters.
+# ----------------------------------------------------------------------------#
+
+
+DATETIME_FORMATS = {
+    "full": "EEEE MMMM, d, y 'at' h:mma",
+    "medium": "EE MM, dd, y h:mma",
+}
+
+
+@lru_cache(maxsize=64)
+def compile_datetime_format(format, locale):
+    """
+  Parsed Babel pattern and locale for a (format, locale) pair, format being
+  one of DATETIME_FORMATS or a Babel pattern
+  """
+    pattern = babel.dates.parse_pattern(DATETIME_FORMATS.get(format, format))
+    return pattern, babel.Locale.parse(locale)
+
+
+@lru_cache(maxsize=4096)
+def _format_datetime(value, format, locale):
+    if not isinstance(value, datetime):
+        value = dateutil.parser.parse(value)
+    pattern, locale = compile_datetime_format(format, locale)
+    return pattern.apply(value, locale)
+
+
+def format_datetime(value, format="medium", locale=babel.dates.LC_TIME):
+    """
+  The "datetime" template filter, value is a datetime or a string parsed with
+  dateutil. The output is memoized, a page lists many shows starting at the
+  same times
+  """
+    return _format_datetime(value, format, locale)
+
+
+# ----------------------------------------------------------------------------#
+# Helper functions.
+# ----------------------------------------------------------------------------#
+
+
+def format_search_results(results):
+    """
+  Build the search response from the (id, name, upcoming_shows_count) rows
+  found, see viewmodels.py
+  """
+    return SearchResults(len(results), [ListItem._make(row) for row in results])
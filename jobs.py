@@ -0,0 +1,39 @@
+# ----------------------------------------------------------------------------#
+# Background jobs.
+# ----------------------------------------------------------------------------#
+# Side effects of a write that the client doesn't need to wait for are handed
+# to run_later() by the controllers once their transaction is committed, and
+# run on a daemon thread of the worker process, in an application context of
+# their own: the rebuild of the search index of search.py. A job belongs to the
+# process which started it and is lost with it, so it must only redo work the
+# next request would do anyway; the writes which must not be lost, like the
+# show counters of counters.py, stay in the transaction.
+#
+# JOBS_BACKEND is "thread", or "inline" to run the job in the request (tests,
+# benchmarks).
+
+from threading import Timer
+
+from flask import current_app
+
+
+def run_job(app, function, args):
+    with app.app_context():
+        try:
+            function(*args)
+        except Exception:
+            app.logger.exception("Job %s failed", function.__name__)
+
+
+def run_later(function, *args, delay=0):
+    """
+  Run function(*args) after delay seconds on a thread of its own, in the
+  request with the "inline" JOBS_BACKEND
+  """
+    app = current_app._get_current_object()
+    if app.config["JOBS_BACKEND"] == "inline":
+        run_job(app, function, args)
+        return
+    timer = Timer(delay, run_job, (app, function, args))
+    timer.daemon = True
+    timer.start()
@@ -0,0 +1,202 @@
+# ----------------------------------------------------------------------------#
+# Metrics.
+# ----------------------------------------------------------------------------#
+# Per-request instrumentation: latency, number and duration of the SQL
+# queries (cursor events) and template render time are added to a
+# Server-Timing header and aggregated per endpoint for the Prometheus /metrics
+# endpoint. The numbers are per worker process.
+#
+# A request running the same SQL statement N_PLUS_ONE_THRESHOLD times or more
+# is logged as a probable N+1 (a query run once per row of a previous one).
+
+import time
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from threading import Lock
+
+from flask import (
+    before_render_template,
+    current_app,
+    g,
+    has_app_context,
+    request,
+    template_rendered,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _instrumented():
+    return has_app_context() and "sql_shapes" in g
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _instrumented():
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _instrumented() and conn.info.get("query_start"):
+        g.sql_time += time.perf_counter() - conn.info["query_start"].pop()
+        # the parameters are bound separately, so the statement is its shape
+        g.sql_shapes[statement] += 1
+
+
+def record_query(statement, seconds):
+    """
+  Count a query run outside of the request thread, see async_db.py
+  """
+    if _instrumented():
+        g.sql_time += seconds
+        g.sql_shapes[statement] += 1
+
+
+def _before_render_template(app, template, context, **extra):
+    if _instrumented():
+        g.template_start = time.perf_counter()
+
+
+def _template_rendered(app, template, context, **extra):
+    if _instrumented() and g.get("template_start") is not None:
+        g.template_time += time.perf_counter() - g.template_start
+        g.template_start = None
+
+
+class Registry(object):
+    """
+  Aggregated metrics of one application
+  """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.requests = Counter()
+        self.latency_buckets = defaultdict(lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+        self.latency_sum = Counter()
+        self.queries = Counter()
+        self.sql_seconds = Counter()
+        self.template_seconds = Counter()
+        self.n_plus_one = Counter()
+
+
+class Metrics(object):
+    """
+  Flask extension instrumenting the requests, the metrics of each application
+  are kept in its extensions
+  """
+
+    def init_app(self, app):
+        app.extensions["metrics"] = Registry()
+        if not app.config["METRICS_ENABLED"]:
+            return
+        if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        before_render_template.connect(_before_render_template, app)
+        template_rendered.connect(_template_rendered, app)
+        app.before_request(self.start_request)
+        app.after_request(self.end_request)
+
+    def start_request(self):
+        g.request_start = time.perf_counter()
+        g.sql_time = 0.0
+        g.sql_shapes = Counter()
+        g.template_time = 0.0
+
+    def end_request(self, response):
+        if "request_start" not in g:
+            return response
+        elapsed = time.perf_counter() - g.request_start
+        endpoint = request.endpoint or "unknown"
+        queries = sum(g.sql_shapes.values())
+        repeated = [
+            (statement, count)
+            for statement, count in g.sql_shapes.items()
+            if count >= current_app.config["N_PLUS_ONE_THRESHOLD"]
+        ]
+        registry = current_app.extensions["metrics"]
+        with registry.lock:
+            registry.requests[endpoint, response.status_code] += 1
+            registry.latency_buckets[endpoint][
+                bisect_left(LATENCY_BUCKETS, elapsed)
+            ] += 1
+            registry.latency_sum[endpoint] += elapsed
+            registry.queries[endpoint] += queries
+            registry.sql_seconds[endpoint] += g.sql_time
+            registry.template_seconds[endpoint] += g.template_time
+            if repeated:
+                registry.n_plus_one[endpoint] += 1
+        for statement, count in repeated:
+            current_app.logger.warning(
+                "Probable N+1 on %s: %d executions of %s", endpoint, count, statement
+            )
+        response.headers.add(
+            "Server-Timing",
+            'db;dur={0:.2f};desc="queries: {1}", tpl;dur={2:.2f}, app;dur={3:.2f}'.format(
+                g.sql_time * 1000, queries, g.template_time * 1000, elapsed * 1000
+            ),
+        )
+        return response
+
+    def render(self):
+        """
+  The metrics in the Prometheus text exposition format
+  """
+        registry = current_app.extensions["metrics"]
+        lines = []
+
+        def header(name, kind, help):
+            lines.append("# HELP {0} {1}".format(name, help))
+            lines.append("# TYPE {0} {1}".format(name, kind))
+
+        def sample(name, value, **labels):
+            labels = ",".join(
+                '{0}="{1}"'.format(key, label) for key, label in sorted(labels.items())
+            )
+            lines.append("{0}{{{1}}} {2}".format(name, labels, value))
+
+        with registry.lock:
+            header(
+                "fyyur_requests_total", "counter", "Requests by endpoint and status."
+            )
+            for (endpoint, status), count in sorted(registry.requests.items()):
+                sample("fyyur_requests_total", count, endpoint=endpoint, status=status)
+
+            name = "fyyur_request_duration_seconds"
+            header(name, "histogram", "Request latency by endpoint.")
+            for endpoint, buckets in sorted(registry.latency_buckets.items()):
+                cumulated = 0
+                for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), buckets):
+                    cumulated += count
+                    sample(name + "_bucket", cumulated, endpoint=endpoint, le=bound)
+                sample(name + "_sum", registry.latency_sum[endpoint], endpoint=endpoint)
+                sample(name + "_count", cumulated, endpoint=endpoint)
+
+            for name, help, counter in (
+                (
+                    "fyyur_db_queries_total",
+                    "SQL queries by endpoint.",
+                    registry.queries,
+                ),
+                (
+                    "fyyur_db_seconds_total",
+                    "Time spent in SQL queries by endpoint.",
+                    registry.sql_seconds,
+                ),
+                (
+                    "fyyur_template_seconds_total",
+                    "Time spent rendering templates by endpoint.",
+                    registry.template_seconds,
+                ),
+                (
+                    "fyyur_n_plus_one_requests_total",
+                    "Requests with a probable N+1 query pattern by endpoint.",
+                    registry.n_plus_one,
+                ),
+            ):
+                header(name, "counter", help)
+                for endpoint, value in sorted(counter.items()):
+                    sample(name, value, endpoint=endpoint)
+        return "\n".join(lines) + "\n"
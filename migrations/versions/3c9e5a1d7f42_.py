@@ -0,0 +1,44 @@
+"""trigram indexes for the venue and artist name search
+
+Revision ID: 3c9e5a1d7f42
+Revises: fe3ab97ac320
+Create Date: 2026-10-18 10:12:41.318207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3c9e5a1d7f42"
+down_revision = "fe3ab97ac320"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # pg_trgm is PostgreSQL only, other databases use the in-process index
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_Venue_name_trgm",
+        "Venue",
+        ["name"],
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_Artist_name_trgm",
+        "Artist",
+        ["name"],
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_index("ix_Artist_name_trgm", table_name="Artist")
+    op.drop_index("ix_Venue_name_trgm", table_name="Venue")
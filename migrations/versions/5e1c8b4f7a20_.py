@@ -0,0 +1,63 @@
+"""upcoming and past show counters on venues and artists
+
+Revision ID: 5e1c8b4f7a20
+Revises: d4a7e9c2b613
+Create Date: 2026-10-18 14:05:41.208133
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5e1c8b4f7a20"
+down_revision = "d4a7e9c2b613"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table, foreign_key in (("Venue", "venue_id"), ("Artist", "artist_id")):
+        op.add_column(
+            table,
+            sa.Column(
+                "upcoming_shows_count", sa.Integer(), nullable=False, server_default="0"
+            ),
+        )
+        op.add_column(
+            table,
+            sa.Column(
+                "past_shows_count", sa.Integer(), nullable=False, server_default="0"
+            ),
+        )
+        op.add_column(table, sa.Column("next_show_time", sa.DateTime(), nullable=True))
+        op.create_index(
+            "ix_{0}_next_show_time".format(table),
+            table,
+            ["next_show_time"],
+            unique=False,
+        )
+        # initial counts, the same statement as "flask counters recount"
+        op.execute(
+            sa.text(
+                'UPDATE "{0}" SET '
+                'upcoming_shows_count = (SELECT count(*) FROM "Show" '
+                'WHERE "Show".{1} = "{0}".id AND "Show".start_time >= :now), '
+                'past_shows_count = (SELECT count(*) FROM "Show" '
+                'WHERE "Show".{1} = "{0}".id AND "Show".start_time < :now), '
+                'next_show_time = (SELECT min("Show".start_time) FROM "Show" '
+                'WHERE "Show".{1} = "{0}".id AND "Show".start_time >= :now)'.format(
+                    table, foreign_key
+                )
+            ).bindparams(now=datetime.now())
+        )
+
+
+def downgrade():
+    for table in ("Artist", "Venue"):
+        op.drop_index("ix_{0}_next_show_time".format(table), table_name=table)
+        op.drop_column(table, "next_show_time")
+        op.drop_column(table, "past_shows_count")
+        op.drop_column(table, "upcoming_shows_count")
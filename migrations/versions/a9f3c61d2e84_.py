@@ -0,0 +1,24 @@
+"""index on the show start time for the listing and the timeline
+
+Revision ID: a9f3c61d2e84
+Revises: 5e1c8b4f7a20
+Create Date: 2026-10-18 15:22:09.471530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a9f3c61d2e84"
+down_revision = "5e1c8b4f7a20"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_Show_start_time_id", "Show", ["start_time", "id"], unique=False)
+
+
+def downgrade():
+    op.drop_index("ix_Show_start_time_id", table_name="Show")
@@ -0,0 +1,112 @@
+"""normalize the venue and artist genres into a Genre table
+
+Revision ID: b81f0c6e2d95
+Revises: 3c9e5a1d7f42
+Create Date: 2026-10-18 11:04:27.902113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b81f0c6e2d95"
+down_revision = "3c9e5a1d7f42"
+branch_labels = None
+depends_on = None
+
+# (entity table, association table, association foreign key)
+GENRE_LINKS = (
+    ("Venue", "venue_genres", "venue_id"),
+    ("Artist", "artist_genres", "artist_id"),
+)
+
+
+def _split_genres(value):
+    return list(
+        dict.fromkeys(name.strip() for name in (value or "").split(",") if name.strip())
+    )
+
+
+def upgrade():
+    genre = op.create_table(
+        "Genre",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=120), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+    links = {}
+    for entity, association, foreign_key in GENRE_LINKS:
+        links[entity] = op.create_table(
+            association,
+            sa.Column("genre_id", sa.Integer(), nullable=False),
+            sa.Column(foreign_key, sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["genre_id"], ["Genre.id"], ondelete="CASCADE"),
+            sa.ForeignKeyConstraint(
+                [foreign_key], [entity + ".id"], ondelete="CASCADE"
+            ),
+            sa.PrimaryKeyConstraint("genre_id", foreign_key),
+        )
+        op.create_index(
+            "ix_{0}_{1}".format(association, foreign_key), association, [foreign_key]
+        )
+
+    # backfill the association tables from the comma-joined strings
+    bind = op.get_bind()
+    rows = {}
+    for entity, _, _ in GENRE_LINKS:
+        table = sa.table(entity, sa.column("id", sa.Integer), sa.column("genres"))
+        rows[entity] = [
+            (row.id, _split_genres(row.genres))
+            for row in bind.execute(sa.select(table.c.id, table.c.genres))
+        ]
+    names = sorted(
+        {name for entity in rows for _, genres in rows[entity] for name in genres}
+    )
+    if names:
+        op.bulk_insert(genre, [{"name": name} for name in names])
+    genre_ids = {
+        row.name: row.id for row in bind.execute(sa.select(genre.c.id, genre.c.name))
+    }
+    for entity, association, foreign_key in GENRE_LINKS:
+        values = [
+            {"genre_id": genre_ids[name], foreign_key: row_id}
+            for row_id, genres in rows[entity]
+            for name in genres
+        ]
+        if values:
+            op.bulk_insert(links[entity], values)
+        op.drop_column(entity, "genres")
+
+
+def downgrade():
+    bind = op.get_bind()
+    genre = sa.table("Genre", sa.column("id", sa.Integer), sa.column("name"))
+    for entity, association, foreign_key in GENRE_LINKS:
+        op.add_column(entity, sa.Column("genres", sa.String(length=120), nullable=True))
+        link = sa.table(
+            association,
+            sa.column("genre_id", sa.Integer),
+            sa.column(foreign_key, sa.Integer),
+        )
+        table = sa.table(entity, sa.column("id", sa.Integer), sa.column("genres"))
+        genres = {}
+        query = (
+            sa.select(link.c[foreign_key], genre.c.name)
+            .select_from(link.join(genre, genre.c.id == link.c.genre_id))
+            .order_by(link.c[foreign_key], genre.c.name)
+        )
+        for row_id, name in bind.execute(query):
+            genres.setdefault(row_id, []).append(name)
+        for row_id, names in genres.items():
+            bind.execute(
+                table.update()
+                .where(table.c.id == row_id)
+                .values(genres=",".join(names))
+            )
+        op.drop_index(
+            "ix_{0}_{1}".format(association, foreign_key), table_name=association
+        )
+        op.drop_table(association)
+    op.drop_table("Genre")
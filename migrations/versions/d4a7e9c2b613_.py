@@ -0,0 +1,55 @@
+"""indexes on the show foreign keys and start time, cascading show deletes
+
+Revision ID: d4a7e9c2b613
+Revises: b81f0c6e2d95
+Create Date: 2026-10-18 11:47:03.551870
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d4a7e9c2b613"
+down_revision = "b81f0c6e2d95"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_Show_venue_id_start_time", "Show", ["venue_id", "start_time"], unique=False
+    )
+    op.create_index(
+        "ix_Show_artist_id_start_time",
+        "Show",
+        ["artist_id", "start_time"],
+        unique=False,
+    )
+    op.create_index("ix_Venue_city_state", "Venue", ["city", "state"], unique=False)
+    # the foreign keys were created without a name, these are the PostgreSQL defaults
+    op.drop_constraint("Show_venue_id_fkey", "Show", type_="foreignkey")
+    op.drop_constraint("Show_artist_id_fkey", "Show", type_="foreignkey")
+    op.create_foreign_key(
+        "Show_venue_id_fkey", "Show", "Venue", ["venue_id"], ["id"], ondelete="CASCADE"
+    )
+    op.create_foreign_key(
+        "Show_artist_id_fkey",
+        "Show",
+        "Artist",
+        ["artist_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
+
+
+def downgrade():
+    op.drop_constraint("Show_artist_id_fkey", "Show", type_="foreignkey")
+    op.drop_constraint("Show_venue_id_fkey", "Show", type_="foreignkey")
+    op.create_foreign_key(
+        "Show_artist_id_fkey", "Show", "Artist", ["artist_id"], ["id"]
+    )
+    op.create_foreign_key("Show_venue_id_fkey", "Show", "Venue", ["venue_id"], ["id"])
+    op.drop_index("ix_Venue_city_state", table_name="Venue")
+    op.drop_index("ix_Show_artist_id_start_time", table_name="Show")
+    op.drop_index("ix_Show_venue_id_start_time", table_name="Show")
@@ -0,0 +1,192 @@
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# the app binds itself with db.init_app(app) so the models can be imported
+# by the query layer without importing the whole application
+db = SQLAlchemy()
+
+
+@event.listens_for(Engine, "connect")
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # SQLite ignores the ON DELETE CASCADE clauses unless asked to enforce them
+    if type(dbapi_connection).__module__.startswith("sqlite3"):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+# ----------------------------------------------------------------------------#
+# Models.
+# ----------------------------------------------------------------------------#
+
+
+# association tables between the venues/artists and their genres, the primary
+# key serves the "venues/artists by genre" lookups and the extra index the
+# genres of a given venue/artist
+venue_genres = db.Table(
+    "venue_genres",
+    db.Column(
+        "genre_id",
+        db.Integer,
+        db.ForeignKey("Genre.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    db.Column(
+        "venue_id",
+        db.Integer,
+        db.ForeignKey("Venue.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    db.Index("ix_venue_genres_venue_id", "venue_id"),
+)
+
+artist_genres = db.Table(
+    "artist_genres",
+    db.Column(
+        "genre_id",
+        db.Integer,
+        db.ForeignKey("Genre.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    db.Column(
+        "artist_id",
+        db.Integer,
+        db.ForeignKey("Artist.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    db.Index("ix_artist_genres_artist_id", "artist_id"),
+)
+
+
+class Genre(db.Model):
+    __tablename__ = "Genre"
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(120), nullable=False, unique=True)
+
+    @classmethod
+    def get_or_create_all(cls, names):
+        """
+  Genre rows for the given names (in the same order, without duplicates),
+  the ones missing from the database are added to the session
+  """
+        names = list(dict.fromkeys(name.strip() for name in names if name.strip()))
+        genres = {genre.name: genre for genre in cls.query.filter(cls.name.in_(names))}
+        for name in names:
+            if name not in genres:
+                genres[name] = cls(name=name)
+                db.session.add(genres[name])
+        return [genres[name] for name in names]
+
+
+class Venue(db.Model):
+    __tablename__ = "Venue"
+    # trigram index used by the name search (see search.py)
+    __table_args__ = (
+        db.Index(
+            "ix_Venue_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        # grouping of the venues listing by area
+        db.Index("ix_Venue_city_state", "city", "state"),
+        # rows to roll over, see counters.py
+        db.Index("ix_Venue_next_show_time", "next_show_time"),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String)
+    city = db.Column(db.String(120))
+    state = db.Column(db.String(120))
+    address = db.Column(db.String(120))
+    phone = db.Column(db.String(120))
+    image_link = db.Column(db.String(500))
+    facebook_link = db.Column(db.String(120))
+    genres = db.relationship("Genre", secondary=venue_genres, order_by=Genre.name)
+    website = db.Column(db.String(120))
+    seeking_talent = db.Column(db.Boolean, nullable=False, default=False)
+    seeking_description = db.Column(db.String(120))
+    # maintained by counters.py when shows are written, read by the listing
+    # and search pages; next_show_time tells when the counts must roll over
+    upcoming_shows_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    past_shows_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    next_show_time = db.Column(db.DateTime())
+    # the shows are removed by the ON DELETE CASCADE of Show.venue_id
+    shows = db.relationship("Show", backref="venue", lazy=True, passive_deletes=True)
+    # Creating the one to many relation with the show class
+
+    # TODO-done: implement any missing fields, as a database migration using Flask-Migrate
+
+    @property
+    def genre_names(self):
+        return [genre.name for genre in self.genres]
+
+
+class Artist(db.Model):
+    __tablename__ = "Artist"
+    # trigram index used by the name search (see search.py)
+    __table_args__ = (
+        db.Index(
+            "ix_Artist_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        # rows to roll over, see counters.py
+        db.Index("ix_Artist_next_show_time", "next_show_time"),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String)
+    city = db.Column(db.String(120))
+    state = db.Column(db.String(120))
+    phone = db.Column(db.String(120))
+    genres = db.relationship("Genre", secondary=artist_genres, order_by=Genre.name)
+    image_link = db.Column(db.String(500))
+    facebook_link = db.Column(db.String(120))
+    seeking_venue = db.Column(db.Boolean, nullable=False, default=False)
+    website = db.Column(db.String(120))
+    seeking_description = db.Column(db.String(120))
+    # maintained by counters.py when shows are written, read by the listing
+    # and search pages; next_show_time tells when the counts must roll over
+    upcoming_shows_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    past_shows_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
+    next_show_time = db.Column(db.DateTime())
+    # Creating the one to many relation with the show class
+    shows = db.relationship("Show", backref="artist", lazy=True, passive_deletes=True)
+
+    # TODO-done: implement any missing fields, as a database migration using Flask-Migrate
+
+    @property
+    def genre_names(self):
+        return [genre.name for genre in self.genres]
+
+
+# TODO-done Implement Show and Artist models, and complete all model relationships and properties, as a database migration.
+
+
+class Show(db.Model):
+    __tablename__ = "Show"
+    # the detail pages and the upcoming shows counts filter on the foreign key
+    # and on a start_time range
+    __table_args__ = (
+        db.Index("ix_Show_venue_id_start_time", "venue_id", "start_time"),
+        db.Index("ix_Show_artist_id_start_time", "artist_id", "start_time"),
+        # the shows listing and the timeline, ordered by (start_time, id)
+        db.Index("ix_Show_start_time_id", "start_time", "id"),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    start_time = db.Column(db.DateTime(), nullable=False)
+    venue_id = db.Column(
+        db.Integer, db.ForeignKey("Venue.id", ondelete="CASCADE"), nullable=False
+    )
+    artist_id = db.Column(
+        db.Integer, db.ForeignKey("Artist.id", ondelete="CASCADE"), nullable=False
+    )
@@ -0,0 +1,297 @@
+# ----------------------------------------------------------------------------#
+# Query layer.
+# ----------------------------------------------------------------------------#
+# The functions in this module run the aggregated SQL needed by the listing
+# pages and hand the raw rows to a shaping function, so the controllers never
+# have to walk the relationships (and trigger lazy loads) themselves.
+
+from datetime import datetime
+from itertools import groupby
+
+from sqlalchemy import select
+
+from extensions import async_db
+from models import db, Venue, Artist, Show, Genre
+from viewmodels import (
+    Area,
+    ArtistPage,
+    ArtistShow,
+    ListedShow,
+    ListItem,
+    VenuePage,
+    VenueShow,
+)
+
+
+def filter_by_genre(query, model, genre):
+    """
+  Restrict a Venue or Artist query to the rows tagged with the given genre
+  name, through the indexed association table (no-op when genre is empty)
+  """
+    if not genre:
+        return query
+    return query.filter(model.genres.any(Genre.name == genre))
+
+
+def group_venues_by_area(rows):
+    """
+  Default shaper for venue_areas(): turns rows ordered by city/state into the
+  Area view models of pages/venues.html
+  """
+    return [
+        Area(
+            city,
+            state,
+            [
+                ListItem(venue.id, venue.name, venue.num_upcoming_shows)
+                for venue in venues
+            ],
+        )
+        for (city, state), venues in groupby(
+            rows, key=lambda row: (row.city, row.state)
+        )
+    ]
+
+
+def venue_areas(shape=group_venues_by_area, genre=None):
+    """
+  Return every venue (of the given genre, if any) with its number of upcoming
+  shows, read from the counter maintained by counters.py, ordered by area, and
+  pass the rows to the given shaping function
+  """
+    query = db.session.query(
+        Venue.id,
+        Venue.name,
+        Venue.city,
+        Venue.state,
+        Venue.upcoming_shows_count.label("num_upcoming_shows"),
+    )
+    rows = (
+        filter_by_genre(query, Venue, genre)
+        .order_by(Venue.city, Venue.state, Venue.name)
+        .all()
+    )
+    return shape(rows)
+
+
+def artist_listing(genre=None):
+    """
+  Id and name, all pages/artists.html shows, of every artist (of the given
+  genre, if any) as row tuples rather than Artist instances
+  """
+    query = db.session.query(Artist.id, Artist.name)
+    return filter_by_genre(query, Artist, genre).all()
+
+
+# Show foreign key of the page entity, then model and foreign key of the other
+# side of its shows, the prefix of their columns and the view models of the
+# page and of its shows
+PAGE_SHOWS = {
+    Venue: (Show.venue_id, Artist, Show.artist_id, "artist", VenuePage, VenueShow),
+    Artist: (Show.artist_id, Venue, Show.venue_id, "venue", ArtistPage, ArtistShow),
+}
+
+
+def shows_statement(model, entity_id):
+    """
+  Shows of a venue or artist with the other side of each show, ordered by
+  start_time, in the columns of its show view model
+  """
+    foreign_key, counterpart, counterpart_key, prefix, _, _ = PAGE_SHOWS[model]
+    return (
+        select(
+            counterpart_key.label(prefix + "_id"),
+            counterpart.name.label(prefix + "_name"),
+            counterpart.image_link.label(prefix + "_image_link"),
+            Show.start_time,
+        )
+        .join(counterpart, counterpart.id == counterpart_key)
+        .where(foreign_key == entity_id)
+        .order_by(Show.start_time)
+    )
+
+
+def genres_statement(model, entity_id):
+    return (
+        select(Genre.name)
+        .select_from(model)
+        .join(model.genres)
+        .where(model.id == entity_id)
+        .order_by(Genre.name)
+    )
+
+
+def page_shows(model, entity_id, now=None):
+    """
+  Past and upcoming shows of a venue or artist as view models, split in a
+  single query: the comparison with now is computed by the database
+  """
+    if now is None:
+        now = datetime.now()
+    show = PAGE_SHOWS[model][5]
+    is_upcoming = (Show.start_time >= now).label("is_upcoming")
+    past_shows = []
+    upcoming_shows = []
+    for row in db.session.execute(
+        shows_statement(model, entity_id).add_columns(is_upcoming)
+    ):
+        (upcoming_shows if row.is_upcoming else past_shows).append(show._make(row[:-1]))
+    return past_shows, upcoming_shows
+
+
+def page_view(model, row, genres, past_shows, upcoming_shows):
+    """
+  View model of the show_venue/show_artist page, the show counts being the
+  ones of the listed shows
+  """
+    return PAGE_SHOWS[model][4](
+        **dict(
+            row._mapping,
+            genres=[name for name, in genres],
+            past_shows=past_shows,
+            upcoming_shows=upcoming_shows,
+            past_shows_count=len(past_shows),
+            upcoming_shows_count=len(upcoming_shows),
+        )
+    )
+
+
+def entity_page(model, entity_id, now=None):
+    """
+  View model of the show_venue/show_artist page of a venue or artist, None
+  when it doesn't exist. Its row, its genres and its shows take three queries
+  """
+    row = db.session.execute(
+        select(model.__table__).where(model.id == entity_id)
+    ).first()
+    if row is None:
+        return None
+    genres = db.session.execute(genres_statement(model, entity_id))
+    return page_view(model, row, genres, *page_shows(model, entity_id, now))
+
+
+async def entity_page_async(model, entity_id, now=None):
+    """
+  entity_page() with ASYNC_VIEWS: its row, its genres and its past and
+  upcoming shows are four queries run concurrently by async_db
+  """
+    if now is None:
+        now = datetime.now()
+    show = PAGE_SHOWS[model][5]
+    shows = shows_statement(model, entity_id)
+    rows, genres, past_shows, upcoming_shows = await async_db.fetch_all(
+        select(model.__table__).where(model.id == entity_id),
+        genres_statement(model, entity_id),
+        shows.where(Show.start_time < now),
+        shows.where(Show.start_time >= now),
+    )
+    if not rows:
+        return None
+    return page_view(
+        model,
+        rows[0],
+        genres,
+        [show._make(row) for row in past_shows],
+        [show._make(row) for row in upcoming_shows],
+    )
+
+
+def encode_show_cursor(start_time, show_id):
+    """
+  Keyset cursor pointing right after the show with the given start_time and id
+  """
+    return "{0}_{1}".format(start_time.isoformat(), show_id)
+
+
+def decode_show_cursor(cursor):
+    """
+  Inverse of encode_show_cursor(), raises ValueError on a malformed cursor
+  """
+    start_time, _, show_id = cursor.rpartition("_")
+    return datetime.fromisoformat(start_time), int(show_id)
+
+
+class ShowsPage(object):
+    """
+  One page of the shows listing, ordered by (start_time, id).
+
+  Iterating over the page runs a single query joining the venue and artist
+  names and yields the rows as ListedShow view models; once
+  the iteration is over next_cursor holds the cursor of the following page
+  (or None on the last one). The rows are not kept in memory, so the page can
+  be fed to a streamed template.
+
+  The shows can be restricted to a [start, end) range of start_time, to the
+  venues of a city and/or state, to an artist and to the artists of a genre.
+  """
+
+    def __init__(
+        self,
+        limit,
+        after=None,
+        yield_per=100,
+        start=None,
+        end=None,
+        city=None,
+        state=None,
+        genre=None,
+        artist_id=None,
+    ):
+        self.limit = limit
+        self.after = after
+        self.yield_per = yield_per
+        self.start = start
+        self.end = end
+        self.city = city
+        self.state = state
+        self.genre = genre
+        self.artist_id = artist_id
+        self.next_cursor = None
+
+    def query(self):
+        query = (
+            db.session.query(
+                Show.id,
+                Show.start_time,
+                Show.venue_id,
+                Venue.name.label("venue_name"),
+                Show.artist_id,
+                Artist.name.label("artist_name"),
+                Artist.image_link.label("artist_image_link"),
+            )
+            .join(Venue, Venue.id == Show.venue_id)
+            .join(Artist, Artist.id == Show.artist_id)
+        )
+        # the range uses ix_Show_start_time_id, the artist
+        # ix_Show_artist_id_start_time and the area ix_Venue_city_state
+        if self.start is not None:
+            query = query.filter(Show.start_time >= self.start)
+        if self.end is not None:
+            query = query.filter(Show.start_time < self.end)
+        if self.city:
+            query = query.filter(Venue.city == self.city)
+        if self.state:
+            query = query.filter(Venue.state == self.state)
+        if self.artist_id is not None:
+            query = query.filter(Show.artist_id == self.artist_id)
+        query = filter_by_genre(query, Artist, self.genre)
+        if self.after is not None:
+            query = query.filter(
+                db.tuple_(Show.start_time, Show.id) > db.tuple_(*self.after)
+            )
+        # fetching one extra row tells us if there is a next page
+        return (
+            query.order_by(Show.start_time, Show.id)
+            .limit(self.limit + 1)
+            .yield_per(self.yield_per)
+        )
+
+    def __iter__(self):
+        self.next_cursor = None
+        last_row = None
+        for index, row in enumerate(self.query()):
+            if index == self.limit:
+                self.next_cursor = encode_show_cursor(last_row.start_time, last_row.id)
+                break
+            last_row = row
+            yield ListedShow._make(row)
@@ -0,0 +1,194 @@
+# ----------------------------------------------------------------------------#
+# Search.
+# ----------------------------------------------------------------------------#
+# On PostgreSQL the name search is served by the pg_trgm GIN indexes created in
+# migration 3c9e5a1d7f42, which make "name ILIKE '%term%'" an index scan and
+# rank the hits with similarity(). Other databases (SQLite test runs) fall back
+# to an in-process inverted index of the name trigrams, rebuilt lazily after
+# the indexed table changes. Once committed, the write controllers call
+# refresh_later(), which rebuilds it on a timer thread rather than in the next
+# search, and once for a burst of writes, as a background job of the process
+# holding the index (see jobs.py).
+#
+# The results are (id, name, upcoming_shows_count) rows rather than model
+# instances: the search pages show nothing else, and a row tuple costs neither
+# the other columns (image_link, seeking_description...) nor a place in the
+# identity map.
+
+from collections import defaultdict
+from threading import Lock
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import jobs
+from models import db, Venue, Artist
+from queries import filter_by_genre
+
+# models whose name can be searched
+SEARCHABLE_MODELS = (Venue, Artist)
+SEARCHABLE = {model.__name__: model for model in SEARCHABLE_MODELS}
+# seconds between a write and the rebuild of the index, the writes made in
+# the meantime are covered by the same rebuild
+REFRESH_DELAY = 1.0
+# columns of the search results
+RESULT_COLUMNS = ("id", "name", "upcoming_shows_count")
+
+
+def ngrams(text, n=3):
+    """
+  Set of the substrings of length n of the text
+  """
+    return {text[i : i + n] for i in range(len(text) - n + 1)}
+
+
+def escape_like(term, escape="\\"):
+    """
+  Escape the LIKE wildcards in a user provided search term
+  """
+    return (
+        term.replace(escape, escape * 2)
+        .replace("%", escape + "%")
+        .replace("_", escape + "_")
+    )
+
+
+class NgramIndex(object):
+    """
+  In-process inverted index mapping every name trigram to the ids of the rows
+  containing it. Candidates are the intersection of the posting lists of the
+  term trigrams, which are then checked for a real substring match and ranked
+  by trigram similarity with the term.
+  """
+
+    def __init__(self, n=3):
+        self.n = n
+        self.names = {}
+        self.postings = defaultdict(set)
+
+    def build(self, rows):
+        self.names = {}
+        self.postings = defaultdict(set)
+        for row_id, name in rows:
+            name = (name or "").lower()
+            self.names[row_id] = name
+            for gram in ngrams(name, self.n):
+                self.postings[gram].add(row_id)
+
+    def similarity(self, term_grams, row_id):
+        name_grams = ngrams(self.names[row_id], self.n)
+        union = term_grams | name_grams
+        if not union:
+            return 0.0
+        return len(term_grams & name_grams) / float(len(union))
+
+    def search(self, term, limit=None):
+        term = term.lower()
+        term_grams = ngrams(term, self.n)
+        if term_grams:
+            postings = sorted(
+                (self.postings.get(gram, set()) for gram in term_grams), key=len
+            )
+            candidates = set.intersection(*postings)
+        else:
+            # terms shorter than n have no trigram, scan the names in memory
+            candidates = self.names
+        matches = [row_id for row_id in candidates if term in self.names[row_id]]
+        matches.sort(
+            key=lambda row_id: (
+                -self.similarity(term_grams, row_id),
+                self.names[row_id],
+                row_id,
+            )
+        )
+        return matches[:limit]
+
+
+_indexes = {}
+_stale = set(SEARCHABLE_MODELS)
+# names of the models with a refresh_index job started by this process
+_refresh_pending = set()
+_lock = Lock()
+
+
+def get_index(model):
+    """
+  Return the fallback index of the model, rebuilding it if the table changed
+  """
+    with _lock:
+        if model in _stale or model not in _indexes:
+            index = NgramIndex()
+            index.build(db.session.query(model.id, model.name))
+            _indexes[model] = index
+            _stale.discard(model)
+        return _indexes[model]
+
+
+def mark_stale(model):
+    with _lock:
+        _stale.add(model)
+
+
+def refresh_index(model_name):
+    """
+  Job rebuilding the fallback index of the model (model_name) if it changed,
+  when it fails the next search rebuilds it
+  """
+    with _lock:
+        _refresh_pending.discard(model_name)
+    get_index(SEARCHABLE[model_name])
+
+
+def refresh_later(model):
+    """
+  Rebuild the fallback index of the model in the background, to be called
+  once its changes are committed
+  """
+    if db.engine.dialect.name == "postgresql":
+        return
+    with _lock:
+        if model.__name__ in _refresh_pending:
+            return
+        _refresh_pending.add(model.__name__)
+    jobs.run_later(refresh_index, model.__name__, delay=REFRESH_DELAY)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flushed_models_stale(session, flush_context):
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(instance, SEARCHABLE_MODELS):
+            mark_stale(type(instance))
+
+
+@event.listens_for(Session, "after_bulk_update")
+@event.listens_for(Session, "after_bulk_delete")
+def _mark_bulk_changed_model_stale(context):
+    if context.mapper.class_ in SEARCHABLE_MODELS:
+        mark_stale(context.mapper.class_)
+
+
+def result_query(model):
+    return db.session.query(*[getattr(model, name) for name in RESULT_COLUMNS])
+
+
+def search(model, term, limit, genre=None):
+    """
+  Return the RESULT_COLUMNS of at most limit rows of the model whose name
+  contains the term (case-insensitive) and tagged with the given genre if any,
+  best matches first
+  """
+    term = term.strip()
+    if db.engine.dialect.name == "postgresql":
+        query = result_query(model).filter(
+            model.name.ilike("%{0}%".format(escape_like(term)), escape="\\")
+        )
+        query = filter_by_genre(query, model, genre)
+        if term:
+            query = query.order_by(db.func.similarity(model.name, term).desc())
+        return query.order_by(model.name, model.id).limit(limit).all()
+
+    # the genre is filtered by the database, so it needs every ranked match
+    ids = get_index(model).search(term, None if genre else limit)
+    query = filter_by_genre(result_query(model).filter(model.id.in_(ids)), model, genre)
+    rows = {row.id: row for row in query.all()}
+    return [rows[row_id] for row_id in ids if row_id in rows][:limit]
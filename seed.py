@@ -0,0 +1,288 @@
+# ----------------------------------------------------------------------------#
+# Synthetic data.
+# ----------------------------------------------------------------------------#
+# "flask seed" fills the database with generated venues, artists and shows to
+# reproduce production volumes. Everything is drawn from a random.Random seeded
+# with --seed, so two runs with the same arguments produce the same rows:
+#   - cities follow a Zipf-like skew, a few big cities hold most of the venues
+#     and artists, the states are the ones of the VenueForm choices
+#   - genres are drawn from the VenueForm/ArtistForm choices, skewed as well
+#   - shows favour the popular venues and artists and are spread around now,
+#     most of them close to it, --past-fraction of them in the past
+# The rows are written in chunks with COPY on PostgreSQL (psycopg2) and with
+# executemany INSERTs elsewhere, with explicit ids continuing after the ones
+# already in the tables.
+
+import csv
+import io
+import random
+from datetime import datetime, timedelta
+from itertools import accumulate, islice
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import func, select, text
+
+from models import db, Genre, Venue, Artist, Show, venue_genres, artist_genres
+import counters
+import search
+
+# (city, state) from the biggest to the smallest market
+CITIES = (
+    ("New York", "NY"),
+    ("Los Angeles", "CA"),
+    ("Chicago", "IL"),
+    ("Houston", "TX"),
+    ("Phoenix", "AZ"),
+    ("Philadelphia", "PA"),
+    ("San Antonio", "TX"),
+    ("San Diego", "CA"),
+    ("Dallas", "TX"),
+    ("San Jose", "CA"),
+    ("Austin", "TX"),
+    ("Jacksonville", "FL"),
+    ("San Francisco", "CA"),
+    ("Columbus", "OH"),
+    ("Indianapolis", "IN"),
+    ("Seattle", "WA"),
+    ("Denver", "CO"),
+    ("Washington", "DC"),
+    ("Nashville", "TN"),
+    ("Boston", "MA"),
+    ("Detroit", "MI"),
+    ("Portland", "OR"),
+    ("Memphis", "TN"),
+    ("Atlanta", "GA"),
+    ("Miami", "FL"),
+    ("Minneapolis", "MN"),
+    ("New Orleans", "LA"),
+    ("Kansas City", "MO"),
+    ("Salt Lake City", "UT"),
+    ("Burlington", "VT"),
+)
+
+VENUE_WORDS = ("Blue", "Golden", "Velvet", "Electric", "Old", "Red", "Silver")
+VENUE_KINDS = ("Hall", "Lounge", "Club", "Theatre", "Room", "Tavern", "Park")
+ARTIST_WORDS = ("Wild", "Midnight", "Lonely", "Neon", "Young", "Broken", "Saint")
+ARTIST_KINDS = ("Band", "Quartet", "Trio", "Orchestra", "Collective", "Sisters")
+
+
+def zipf_weights(count, exponent=1.1):
+    """
+  Cumulative weights of count items ranked by popularity
+  """
+    return list(accumulate(1.0 / rank ** exponent for rank in range(1, count + 1)))
+
+
+def form_choices(form, field):
+    return [value for value, label in getattr(form, field).kwargs["choices"]]
+
+
+def next_id(model):
+    return (db.session.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def chunked(rows, size):
+    rows = iter(rows)
+    chunk = list(islice(rows, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(rows, size))
+
+
+def write_rows(table, rows, chunk_size):
+    """
+  Write dict rows to table, with COPY when the connection is a psycopg2 one
+  """
+    connection = db.session.connection()
+    copy = connection.dialect.driver == "psycopg2"
+    for chunk in chunked(rows, chunk_size):
+        if not copy:
+            connection.execute(table.insert(), chunk)
+            continue
+        columns = list(chunk[0])
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(
+            [row[column] for column in columns] for row in chunk
+        )
+        buffer.seek(0)
+        cursor = connection.connection.cursor()
+        cursor.copy_expert(
+            'COPY "{0}" ({1}) FROM STDIN WITH CSV'.format(
+                table.name, ", ".join('"{0}"'.format(column) for column in columns)
+            ),
+            buffer,
+        )
+
+
+def reset_sequences(*tables):
+    """
+  Move the id sequences past the explicit ids written, PostgreSQL only
+  """
+    if db.engine.dialect.name != "postgresql":
+        return
+    for table in tables:
+        db.session.execute(
+            text(
+                "SELECT setval(pg_get_serial_sequence('\"{0}\"', 'id'), "
+                'MAX(id)) FROM "{0}"'.format(table.name)
+            )
+        )
+
+
+def seed(
+    venues,
+    artists,
+    shows,
+    seed=0,
+    past_fraction=0.5,
+    spread_days=365,
+    chunk_size=10000,
+    now=None,
+):
+    """
+  Generate and write venues, artists and shows, return the number of rows
+  written per table
+  """
+    # WTForms is only imported when the choices are needed
+    from forms import VenueForm, ArtistForm
+
+    rng = random.Random(seed)
+    now = now or datetime.now()
+    states = set(form_choices(VenueForm, "state"))
+    cities = [(city, state) for city, state in CITIES if state in states]
+    city_weights = zipf_weights(len(cities))
+
+    genre_names = form_choices(VenueForm, "genres")
+    genre_names += [
+        name for name in form_choices(ArtistForm, "genres") if name not in genre_names
+    ]
+    genres = Genre.get_or_create_all(genre_names)
+    db.session.flush()
+    # a different popularity order each seed, Zipf-skewed
+    genre_ids = [genre.id for genre in rng.sample(genres, len(genres))]
+    genre_weights = zipf_weights(len(genre_ids))
+
+    def pick_genres():
+        return set(
+            rng.choices(genre_ids, cum_weights=genre_weights, k=rng.randint(1, 3))
+        )
+
+    def phone():
+        return "{0:03d}-{1:03d}-{2:04d}".format(
+            rng.randrange(200, 1000), rng.randrange(1000), rng.randrange(10000)
+        )
+
+    first_venue = next_id(Venue)
+    first_artist = next_id(Artist)
+    first_show = next_id(Show)
+    venue_ids = range(first_venue, first_venue + venues)
+    artist_ids = range(first_artist, first_artist + artists)
+
+    def venue_rows():
+        for id in venue_ids:
+            city, state = rng.choices(cities, cum_weights=city_weights)[0]
+            name = "The {0} {1}".format(
+                rng.choice(VENUE_WORDS), rng.choice(VENUE_KINDS)
+            )
+            yield {
+                "id": id,
+                "name": "{0} {1}".format(name, id),
+                "city": city,
+                "state": state,
+                "address": "{0} {1} St".format(rng.randrange(1, 2000), name.split()[1]),
+                "phone": phone(),
+                "image_link": None,
+                "facebook_link": "https://www.facebook.com/venue{0}".format(id),
+                "website": "https://venue{0}.example.com".format(id),
+                "seeking_talent": rng.random() < 0.3,
+                "seeking_description": None,
+            }
+
+    def artist_rows():
+        for id in artist_ids:
+            city, state = rng.choices(cities, cum_weights=city_weights)[0]
+            yield {
+                "id": id,
+                "name": "{0} {1} {2}".format(
+                    rng.choice(ARTIST_WORDS), rng.choice(ARTIST_KINDS), id
+                ),
+                "city": city,
+                "state": state,
+                "phone": phone(),
+                "image_link": None,
+                "facebook_link": "https://www.facebook.com/artist{0}".format(id),
+                "website": "https://artist{0}.example.com".format(id),
+                "seeking_venue": rng.random() < 0.3,
+                "seeking_description": None,
+            }
+
+    def genre_rows(ids, foreign_key):
+        for id in ids:
+            for genre_id in pick_genres():
+                yield {foreign_key: id, "genre_id": genre_id}
+
+    def show_rows():
+        # the popular venues and artists, ranked by id, get most of the shows
+        venue_weights = zipf_weights(venues, 0.8)
+        artist_weights = zipf_weights(artists, 0.8)
+        mean_days = spread_days / 4.0
+        for id in range(first_show, first_show + shows):
+            days = min(rng.expovariate(1.0 / mean_days), spread_days)
+            if rng.random() < past_fraction:
+                days = -days
+            start_time = now + timedelta(days=days)
+            yield {
+                "id": id,
+                "venue_id": rng.choices(venue_ids, cum_weights=venue_weights)[0],
+                "artist_id": rng.choices(artist_ids, cum_weights=artist_weights)[0],
+                # shows start on the hour, in the evening
+                "start_time": start_time.replace(
+                    hour=rng.randint(18, 23), minute=0, second=0, microsecond=0
+                ),
+            }
+
+    write_rows(Venue.__table__, venue_rows(), chunk_size)
+    write_rows(venue_genres, genre_rows(venue_ids, "venue_id"), chunk_size)
+    write_rows(Artist.__table__, artist_rows(), chunk_size)
+    write_rows(artist_genres, genre_rows(artist_ids, "artist_id"), chunk_size)
+    if venues and artists:
+        write_rows(Show.__table__, show_rows(), chunk_size)
+    else:
+        shows = 0
+    reset_sequences(Venue.__table__, Artist.__table__, Show.__table__)
+    # the new shows only belong to the new venues and artists
+    counters.recount(Venue, Venue.id >= first_venue, now)
+    counters.recount(Artist, Artist.id >= first_artist, now)
+    db.session.commit()
+    # the rows were written without the ORM, see search.py
+    search.mark_stale(Venue)
+    search.mark_stale(Artist)
+    return {"venues": venues, "artists": artists, "shows": shows}
+
+
+@click.command("seed")
+@click.option("--venues", type=int, default=1000, show_default=True)
+@click.option("--artists", type=int, default=1000, show_default=True)
+@click.option("--shows", type=int, default=10000, show_default=True)
+@click.option("--seed", "seed_", type=int, default=0, show_default=True)
+@click.option("--past-fraction", type=float, default=0.5, show_default=True)
+@click.option("--spread-days", type=int, default=365, show_default=True)
+@click.option("--chunk-size", type=int, default=10000, show_default=True)
+@with_appcontext
+def seed_command(venues, artists, shows, seed_, past_fraction, spread_days, chunk_size):
+    """
+  Generate venues, artists and shows for scale testing
+  """
+    written = seed(
+        venues,
+        artists,
+        shows,
+        seed=seed_,
+        past_fraction=past_fraction,
+        spread_days=spread_days,
+        chunk_size=chunk_size,
+    )
+    click.echo(
+        "{venues} venues, {artists} artists and {shows} shows written".format(**written)
+    )
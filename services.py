@@ -0,0 +1,166 @@
+# ----------------------------------------------------------------------------#
+# Write path.
+# ----------------------------------------------------------------------------#
+# The create controllers hand the submitted values to these functions, which
+# write the row with INSERT ... RETURNING and return the persisted values from
+# that same statement: nothing is read back after the commit. A failed write
+# is rolled back and raised as a WriteError:
+#   - InvalidData: a submitted field is missing, the name is empty, or the
+#     show's ids or start time are malformed
+#   - UnknownReference: the show's venue or artist doesn't exist
+#   - DatabaseError: anything the database refused otherwise
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from cache import fragment_key
+from extensions import page_cache
+from models import db, Genre, Venue, Artist, Show, venue_genres, artist_genres
+import counters
+import search
+
+
+class WriteError(Exception):
+    pass
+
+
+class InvalidData(WriteError):
+    pass
+
+
+class UnknownReference(WriteError):
+    pass
+
+
+class DatabaseError(WriteError):
+    pass
+
+
+def log_write_error(error, message):
+    """
+  Log the WriteError being handled: with its traceback when the database
+  failed, as a warning when it comes from the submitted data
+  """
+    if isinstance(error, DatabaseError):
+        current_app.logger.exception(message)
+    else:
+        current_app.logger.warning("%s: %s", message, error)
+
+
+# fields of the venue and artist forms, besides the seeking flag and genres
+VENUE_FIELDS = (
+    "name",
+    "city",
+    "state",
+    "address",
+    "phone",
+    "image_link",
+    "facebook_link",
+    "website",
+    "seeking_description",
+)
+ARTIST_FIELDS = (
+    "name",
+    "city",
+    "state",
+    "phone",
+    "image_link",
+    "facebook_link",
+    "website",
+    "seeking_description",
+)
+
+
+def check_values(values, fields):
+    """
+  Raise InvalidData unless every field was submitted and the name isn't empty
+  """
+    missing = [field for field in fields if field not in values]
+    if missing:
+        raise InvalidData("missing fields: {0}".format(", ".join(missing)))
+    if not (values["name"] or "").strip():
+        raise InvalidData("name is empty")
+
+
+def insert_returning(model, values):
+    """
+  Insert the row and return its columns, as stored, as a dict
+  """
+    table = model.__table__
+    row = db.session.execute(table.insert().values(**values).returning(*table.c)).one()
+    return dict(row._mapping)
+
+
+def create_with_genres(model, association, foreign_key, values, genre_names):
+    try:
+        data = insert_returning(model, values)
+        genres = Genre.get_or_create_all(genre_names)
+        if genres:
+            # the new genres get their id
+            db.session.flush()
+            db.session.execute(
+                association.insert(),
+                [{foreign_key: data["id"], "genre_id": genre.id} for genre in genres],
+            )
+        data["genres"] = [genre.name for genre in genres]
+        db.session.commit()
+    except SQLAlchemyError as error:
+        db.session.rollback()
+        raise DatabaseError(str(error)) from error
+    return data
+
+
+def create_venue(values, genre_names=()):
+    """
+  Store a venue with the given column values and genres, return its data
+  """
+    check_values(values, VENUE_FIELDS)
+    data = create_with_genres(Venue, venue_genres, "venue_id", values, genre_names)
+    # written without the ORM, see search.py
+    search.mark_stale(Venue)
+    search.refresh_later(Venue)
+    # a new venue is only in the listing, it has no page cached yet
+    page_cache.invalidate([fragment_key("venues")])
+    return data
+
+
+def create_artist(values, genre_names=()):
+    """
+  Store an artist with the given column values and genres, return its data
+  """
+    check_values(values, ARTIST_FIELDS)
+    data = create_with_genres(Artist, artist_genres, "artist_id", values, genre_names)
+    search.mark_stale(Artist)
+    search.refresh_later(Artist)
+    page_cache.invalidate([fragment_key("artists")])
+    return data
+
+
+def create_show(venue_id, artist_id, start_time):
+    """
+  Store a show and count it in the counters of its venue and artist, return
+  its data
+  """
+    try:
+        values = {
+            "venue_id": int(venue_id),
+            "artist_id": int(artist_id),
+            "start_time": start_time,
+        }
+    except (TypeError, ValueError):
+        raise InvalidData("venue_id and artist_id must be integers")
+    if start_time is None:
+        raise InvalidData("start_time is missing or malformed")
+    try:
+        data = insert_returning(Show, values)
+        counters.record_shows([data])
+        db.session.commit()
+    except IntegrityError as error:
+        db.session.rollback()
+        # the only constraints a valid show can break are its foreign keys
+        raise UnknownReference(str(error.orig)) from error
+    except SQLAlchemyError as error:
+        db.session.rollback()
+        raise DatabaseError(str(error)) from error
+    page_cache.invalidate(page_cache.show_keys(data["venue_id"], data["artist_id"]))
+    return data
@@ -0,0 +1,174 @@
+# ----------------------------------------------------------------------------#
+# Bulk show import.
+# ----------------------------------------------------------------------------#
+# Schedules sent by the booking partners are read row by row from a CSV file
+# (artist_id,venue_id,start_time header) or JSON lines, validated with the
+# ShowForm rules and written in chunks: one lookup of the venues and artists
+# of the chunk, one executemany INSERT and one commit per chunk. An invalid row
+# is reported with its line number and skipped, the rest of the import goes on.
+# start_time is any ISO 8601 local time, "2036-01-01 20:00:00" as well as the
+# "2036-01-01T20:00:00" of the API, so exported shows can be imported again.
+
+import csv
+import json
+from datetime import datetime
+from itertools import islice
+
+from werkzeug.datastructures import MultiDict
+
+from extensions import page_cache
+from models import db, Venue, Artist, Show
+import counters
+
+FORMATS = ("csv", "jsonl")
+
+
+def read_rows(stream, format):
+    """
+  Yield (line number, row dict) from a text stream in one of FORMATS
+  """
+    if format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif format == "jsonl":
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_number, row if isinstance(row, dict) else None
+    else:
+        raise ValueError("unknown format {0!r}".format(format))
+
+
+class ImportReport(object):
+    def __init__(self):
+        self.inserted = 0
+        self.errors = []
+
+    def error(self, line_number, message):
+        self.errors.append({"line": line_number, "error": message})
+
+    def as_dict(self):
+        return {
+            "inserted": self.inserted,
+            "failed": len(self.errors),
+            "errors": sorted(self.errors, key=lambda error: error["line"]),
+        }
+
+
+def validate_row(row):
+    """
+  Show values of the row, or the error message if it breaks the ShowForm rules
+  """
+    from forms import ShowForm
+
+    if row is None:
+        return None, "invalid row"
+    formdata = {key: str(value) for key, value in row.items()}
+    # parsed here, the form field only takes "%Y-%m-%d %H:%M:%S"; a field
+    # missing from the formdata would fall back to its default, the time
+    # forms.py was imported
+    start_time = formdata.get("start_time", "").strip()
+    if not start_time:
+        return None, "start_time is required"
+    try:
+        start_time = datetime.fromisoformat(start_time)
+    except ValueError:
+        return None, "malformed start_time {0!r}".format(formdata["start_time"])
+    if start_time.tzinfo is not None:
+        return (
+            None,
+            "malformed start_time {0!r}, expected a local time".format(
+                formdata["start_time"]
+            ),
+        )
+    formdata["start_time"] = start_time.strftime("%Y-%m-%d %H:%M:%S")
+    form = ShowForm(formdata=MultiDict(formdata), meta={"csrf": False})
+    if not form.validate():
+        return (
+            None,
+            "; ".join(
+                "{0}: {1}".format(field, ", ".join(messages))
+                for field, messages in form.errors.items()
+            ),
+        )
+    try:
+        venue_id = int(form.venue_id.data)
+        artist_id = int(form.artist_id.data)
+    except (TypeError, ValueError):
+        return None, "venue_id and artist_id must be integers"
+    return (
+        {"venue_id": venue_id, "artist_id": artist_id, "start_time": start_time,},
+        None,
+    )
+
+
+def import_chunk(rows, report):
+    values = []
+    for line_number, row in rows:
+        show, error = validate_row(row)
+        if error:
+            report.error(line_number, error)
+        else:
+            values.append((line_number, show))
+    if not values:
+        return
+    # existence of the venues and artists of the whole chunk in two queries
+    venue_ids = {show["venue_id"] for _, show in values}
+    artist_ids = {show["artist_id"] for _, show in values}
+    venue_ids = {
+        venue_id
+        for venue_id, in db.session.query(Venue.id).filter(Venue.id.in_(venue_ids))
+    }
+    artist_ids = {
+        artist_id
+        for artist_id, in db.session.query(Artist.id).filter(Artist.id.in_(artist_ids))
+    }
+    shows = []
+    for line_number, show in values:
+        if show["venue_id"] not in venue_ids:
+            report.error(
+                line_number, "venue {0} does not exist".format(show["venue_id"])
+            )
+        elif show["artist_id"] not in artist_ids:
+            report.error(
+                line_number, "artist {0} does not exist".format(show["artist_id"])
+            )
+        else:
+            shows.append((line_number, show))
+    if not shows:
+        return
+    try:
+        # a list of parameters makes it a single executemany
+        db.session.execute(Show.__table__.insert(), [show for _, show in shows])
+        counters.record_shows(show for _, show in shows)
+        db.session.commit()
+    except Exception as error:
+        db.session.rollback()
+        for line_number, _ in shows:
+            report.error(line_number, "database error: {0}".format(error))
+        return
+    report.inserted += len(shows)
+    keys = set()
+    for _, show in shows:
+        keys.update(page_cache.show_keys(show["venue_id"], show["artist_id"]))
+    page_cache.invalidate(keys)
+
+
+def import_shows(rows, chunk_size=1000):
+    """
+  Import the (line number, row) pairs in chunks of chunk_size rows and return
+  the ImportReport
+  """
+    report = ImportReport()
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        import_chunk(chunk, report)
+    return report
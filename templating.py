@@ -0,0 +1,95 @@
+# ----------------------------------------------------------------------------#
+# Templates.
+# ----------------------------------------------------------------------------#
+# Compiling the templates is done once per deployment instead of once per
+# worker: with TEMPLATE_CACHE_DIR the compiled templates are kept in that
+# directory (a Jinja FileSystemBytecodeCache, the source checksum is checked so
+# an edited template is compiled again) and "flask templates compile" fills it
+# at deploy time.
+#
+# {% cache key, ttl %}...{% endcache %} stores the rendered fragment in the
+# page cache backend for ttl seconds (PAGE_CACHE_TTL by default), an empty key
+# renders it without caching. The venues and artists listings are cached as a
+# whole under "venues" and "artists", dropped by PageCache.venue_keys and
+# artist_keys on every write; their views hand the query to the template as a
+# callable, so a cached listing costs no query either. (Caching every tile on
+# its own was measured slower than rendering it: a lookup per tile costs more
+# than its five lines of HTML.)
+
+import os
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+from cache import fragment_key
+from extensions import page_cache
+
+
+class FragmentCacheExtension(Extension):
+    tags = {"cache"}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        if parser.stream.skip_if("comma"):
+            args.append(parser.parse_expression())
+        else:
+            args.append(nodes.Const(None))
+        body = parser.parse_statements(["name:endcache"], drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method("_cached_fragment", args), [], [], body
+        ).set_lineno(lineno)
+
+    def _cached_fragment(self, key, ttl, caller):
+        if not key:
+            return caller()
+        key = fragment_key(key)
+        cached = page_cache.backend.get(key)
+        if cached is None:
+            cached = page_cache.store(key, caller(), True, ttl)
+        return Markup(cached[1])
+
+
+def init_templates(app):
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    if app.config["TEMPLATE_CACHE_DIR"]:
+        os.makedirs(app.config["TEMPLATE_CACHE_DIR"], exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(
+            app.config["TEMPLATE_CACHE_DIR"]
+        )
+
+
+def compile_templates(app):
+    """
+  Compile every template of the application, return their number
+  """
+    names = app.jinja_env.list_templates(extensions=["html"])
+    for name in names:
+        app.jinja_env.get_template(name)
+    return len(names)
+
+
+@click.group("templates")
+def templates_cli():
+    """
+  Compiled templates cache
+  """
+
+
+@templates_cli.command("compile")
+@with_appcontext
+def compile_command():
+    """
+  Compile the templates into TEMPLATE_CACHE_DIR
+  """
+    if not current_app.config["TEMPLATE_CACHE_DIR"]:
+        raise click.UsageError("TEMPLATE_CACHE_DIR is not set")
+    click.echo(
+        "{0} templates compiled into {1}".format(
+            compile_templates(current_app), current_app.config["TEMPLATE_CACHE_DIR"]
+        )
+    )
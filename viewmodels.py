@@ -0,0 +1,54 @@
+# ----------------------------------------------------------------------------#
+# View models.
+# ----------------------------------------------------------------------------#
+# The pages are rendered from these namedtuples, built straight from the SQL
+# rows by queries.py. A namedtuple has fixed fields and no per-instance dict
+# (__slots__ = ()): a page of shows costs a tuple per show instead of a dict,
+# and only the fields listed here reach the templates. The start times stay
+# datetimes, formatted by the "datetime" template filter.
+
+from collections import namedtuple
+
+from models import Venue, Artist
+
+# a venue or artist of a listing or of the search results
+ListItem = namedtuple("ListItem", ("id", "name", "num_upcoming_shows"))
+# the venues of pages/venues.html, grouped by area
+Area = namedtuple("Area", ("city", "state", "venues"))
+SearchResults = namedtuple("SearchResults", ("count", "data"))
+
+# a show of the shows listing, fields in the order selected by ShowsPage
+ListedShow = namedtuple(
+    "ListedShow",
+    (
+        "id",
+        "start_time",
+        "venue_id",
+        "venue_name",
+        "artist_id",
+        "artist_name",
+        "artist_image_link",
+    ),
+)
+# a show of a venue page and of an artist page
+VenueShow = namedtuple(
+    "VenueShow", ("artist_id", "artist_name", "artist_image_link", "start_time")
+)
+ArtistShow = namedtuple(
+    "ArtistShow", ("venue_id", "venue_name", "venue_image_link", "start_time")
+)
+
+
+def page_model(model):
+    """
+  View model of the show_venue/show_artist page of the model: its columns,
+  genre names and past and upcoming shows
+  """
+    columns = tuple(column.key for column in model.__table__.columns)
+    return namedtuple(
+        model.__name__ + "Page", columns + ("genres", "past_shows", "upcoming_shows")
+    )
+
+
+VenuePage = page_model(Venue)
+ArtistPage = page_model(Artist)
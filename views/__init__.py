@@ -0,0 +1,14 @@
+# ----------------------------------------------------------------------------#
+# Controllers.
+# ----------------------------------------------------------------------------#
+# Every area of the site is a blueprint registered by create_app()
+
+from views import api, artists, pages, shows, venues
+
+blueprints = (pages.bp, venues.bp, artists.bp, shows.bp, api.bp)
+
+# endpoints served by an async view with ASYNC_VIEWS, see async_db.py
+async_views = {
+    "venues.show_venue": venues.show_venue_async,
+    "artists.show_artist": artists.show_artist_async,
+}
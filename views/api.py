@@ -0,0 +1,233 @@
+# ----------------------------------------------------------------------------#
+# JSON API.
+# ----------------------------------------------------------------------------#
+# /api/v1/ exposes the data of the HTML pages as JSON. ?fields=id,name limits
+# the response (and the selected columns) to the given fields and the
+# listings are paginated with the ?after= cursor returned as next_cursor.
+
+import json
+from datetime import date, datetime
+
+from flask import Blueprint, abort, current_app, jsonify, request
+
+from helpers import format_search_results
+from models import db, Venue, Artist
+import queries
+import search
+
+try:
+    # optional, several times faster than the json module
+    import orjson
+except ImportError:
+    orjson = None
+
+bp = Blueprint("api", __name__, url_prefix="/api/v1")
+
+RESOURCES = {"venues": Venue, "artists": Artist}
+# bookkeeping of counters.py, not exposed
+PRIVATE_COLUMNS = ("next_show_time",)
+LIST_DEFAULT_FIELDS = ("id", "name", "city", "state", "num_upcoming_shows")
+SHOW_FIELDS = (
+    "venue_id",
+    "venue_name",
+    "artist_id",
+    "artist_name",
+    "artist_image_link",
+    "start_time",
+)
+
+
+def _default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(repr(value))
+
+
+def json_response(data, status=200):
+    if orjson is not None:
+        body = orjson.dumps(data, default=_default)
+    else:
+        body = json.dumps(data, default=_default, separators=(",", ":"))
+    return current_app.response_class(body, status, mimetype="application/json")
+
+
+def column_names(model):
+    return [
+        column.key
+        for column in model.__table__.columns
+        if column.key not in PRIVATE_COLUMNS
+    ]
+
+
+def requested_fields(allowed, default):
+    """
+  Fields asked with ?fields=, all the default ones when missing. Unknown
+  fields are a 400
+  """
+    if not request.args.get("fields"):
+        return list(default)
+    fields = [field.strip() for field in request.args["fields"].split(",")]
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        abort(400, "unknown fields: {0}".format(", ".join(unknown)))
+    return list(dict.fromkeys(fields))
+
+
+def page_limit():
+    limit = request.args.get("limit", current_app.config["API_PAGE_SIZE"], type=int)
+    return max(1, min(limit, current_app.config["API_MAX_PAGE_SIZE"]))
+
+
+@bp.errorhandler(400)
+@bp.errorhandler(404)
+def api_error(error):
+    return jsonify({"error": error.description}), error.code
+
+
+#  Venues and artists
+#  ----------------------------------------------------------------
+
+
+@bp.route("/<any(venues, artists):resource>")
+def list_resource(resource):
+    model = RESOURCES[resource]
+    columns = column_names(model)
+    fields = requested_fields(columns + ["num_upcoming_shows"], LIST_DEFAULT_FIELDS)
+    limit = page_limit()
+    # only the requested columns are selected, plus the id used by the cursor
+    selected = ["id"] + [field for field in fields if field in columns]
+    if "num_upcoming_shows" in fields:
+        selected.append("upcoming_shows_count")
+    query = db.session.query(*[getattr(model, name) for name in selected])
+    query = queries.filter_by_genre(query, model, request.args.get("genre"))
+    if request.args.get("after"):
+        try:
+            query = query.filter(model.id > int(request.args["after"]))
+        except ValueError:
+            abort(400, "invalid cursor")
+    rows = query.order_by(model.id).limit(limit + 1).all()
+    next_cursor = str(rows[limit - 1].id) if len(rows) > limit else None
+    rows = rows[:limit]
+    data = []
+    for row in rows:
+        item = {field: getattr(row, field, None) for field in fields}
+        if "num_upcoming_shows" in fields:
+            item["num_upcoming_shows"] = row.upcoming_shows_count
+        data.append(item)
+    return json_response({"data": data, "next_cursor": next_cursor})
+
+
+@bp.route("/<any(venues, artists):resource>/<int:entity_id>")
+def show_resource(resource, entity_id):
+    model = RESOURCES[resource]
+    columns = column_names(model)
+    # the counts are columns, maintained by counters.py
+    shows_fields = ["past_shows", "upcoming_shows"]
+    detail_fields = columns + ["genres"] + shows_fields
+    fields = requested_fields(detail_fields, detail_fields)
+    selected = ["id"] + [field for field in fields if field in columns]
+    row = (
+        db.session.query(*[getattr(model, name) for name in selected])
+        .filter(model.id == entity_id)
+        .first()
+    )
+    if row is None:
+        abort(404, "{0} {1} not found".format(resource, entity_id))
+    data = {field: getattr(row, field) for field in fields if field in columns}
+    if "genres" in fields:
+        genres = db.session.execute(queries.genres_statement(model, entity_id))
+        data["genres"] = [name for name, in genres]
+    if any(field in fields for field in shows_fields):
+        past_shows, upcoming_shows = queries.page_shows(model, entity_id)
+        for field, shows in (
+            ("past_shows", past_shows),
+            ("upcoming_shows", upcoming_shows),
+        ):
+            if field in fields:
+                # the start times of the detail were always str(datetime)
+                data[field] = [
+                    dict(show._asdict(), start_time=str(show.start_time))
+                    for show in shows
+                ]
+    return json_response(data)
+
+
+#  Shows
+#  ----------------------------------------------------------------
+
+
+def show_cursor():
+    if not request.args.get("after"):
+        return None
+    try:
+        return queries.decode_show_cursor(request.args["after"])
+    except ValueError:
+        abort(400, "invalid cursor")
+
+
+def datetime_arg(name, default=None):
+    """
+  ISO 8601 date or datetime of the query string, a date is its midnight
+  """
+    if not request.args.get(name):
+        return default
+    try:
+        return datetime.fromisoformat(request.args[name])
+    except ValueError:
+        abort(400, "invalid {0}: expected an ISO 8601 date".format(name))
+
+
+def shows_response(page):
+    fields = requested_fields(SHOW_FIELDS, SHOW_FIELDS)
+    data = [{field: getattr(show, field) for field in fields} for show in page]
+    return json_response({"data": data, "next_cursor": page.next_cursor})
+
+
+@bp.route("/shows")
+def list_shows():
+    return shows_response(queries.ShowsPage(page_limit(), after=show_cursor()))
+
+
+@bp.route("/timeline")
+def timeline():
+    """
+  What's on: the shows ordered by start time, from now on unless ?from= is
+  given, up to ?to= (excluded), filtered by the ?city= and ?state= of the
+  venue, the ?genre= of the artist and ?artist_id=
+  """
+    try:
+        artist_id = int(request.args["artist_id"])
+    except KeyError:
+        artist_id = None
+    except ValueError:
+        abort(400, "invalid artist_id")
+    page = queries.ShowsPage(
+        page_limit(),
+        after=show_cursor(),
+        start=datetime_arg("from", datetime.now()),
+        end=datetime_arg("to"),
+        city=request.args.get("city"),
+        state=request.args.get("state"),
+        genre=request.args.get("genre"),
+        artist_id=artist_id,
+    )
+    return shows_response(page)
+
+
+#  Search
+#  ----------------------------------------------------------------
+
+
+@bp.route("/search/<any(venues, artists):resource>")
+def search_resource(resource):
+    model = RESOURCES[resource]
+    results = search.search(
+        model,
+        request.args.get("search_term", ""),
+        min(page_limit(), current_app.config["SEARCH_RESULTS_LIMIT"]),
+        genre=request.args.get("genre"),
+    )
+    results = format_search_results(results)
+    return json_response(
+        {"count": results.count, "data": [item._asdict() for item in results.data]}
+    )
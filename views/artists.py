@@ -0,0 +1,191 @@
+import sys
+from flask import (
+    Blueprint,
+    abort,
+    current_app,
+    flash,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
+
+from extensions import page_cache
+from helpers import format_search_results
+from models import db, Artist, Genre
+import queries
+import search
+import services
+
+bp = Blueprint("artists", __name__)
+
+
+#  Artists
+#  ----------------------------------------------------------------
+@bp.route("/artists")
+def artists():
+    # TODO-done: replace with real data returned from querying the database
+    # ?genre= restricts the listing to the artists of that genre
+    # called by the template only when its cached listing is missing
+    artists = lambda: queries.artist_listing(request.args.get("genre"))
+    return render_template("pages/artists.html", artists=artists)
+
+
+@bp.route("/artists/search", methods=["POST"])
+def search_artists():
+    # TODO-done: implement search on artists with partial string search. Ensure it is case-insensitive.
+    # seach for "A" should return "Guns N Petals", "Matt Quevado", and "The Wild Sax Band".
+    # search for "band" should return "The Wild Sax Band".
+    search_term = request.form.get("search_term", "")
+    search_term = (
+        search_term.strip()
+    )  # removing the spaces form the beginning and the end
+    # indexed and ranked search, see search.py
+    results = search.search(
+        Artist,
+        search_term,
+        current_app.config["SEARCH_RESULTS_LIMIT"],
+        genre=request.form.get("genre"),
+    )
+    # Format the data to be in the desired format
+    response = format_search_results(results)
+    return render_template(
+        "pages/search_artists.html",
+        results=response,
+        search_term=request.form.get("search_term", ""),
+    )
+
+
+@bp.route("/artists/<int:artist_id>")
+def show_artist(artist_id):
+    # shows the venue page with the given venue_id
+    # the rendered page is cached until the artist or one of its shows changes
+    return page_cache.respond(
+        "artist", artist_id, lambda: render_artist_page(artist_id)
+    )
+
+
+async def show_artist_async(artist_id):
+    # show_artist() with ASYNC_VIEWS, see async_db.py
+    return await page_cache.respond_async(
+        "artist", artist_id, lambda: render_artist_page_async(artist_id)
+    )
+
+
+async def render_artist_page_async(artist_id):
+    data = await queries.entity_page_async(Artist, artist_id)
+    if data is None:
+        abort(404)
+    return render_template("pages/show_artist.html", artist=data)
+
+
+def render_artist_page(artist_id):
+    # TODO-done: replace with real venue data from the venues table, using venue_id
+    # the artist columns, genre names and past and upcoming shows with their
+    # venues, see viewmodels.py
+    data = queries.entity_page(Artist, artist_id)
+    if data is None:
+        abort(404)
+    return render_template("pages/show_artist.html", artist=data)
+
+
+#  Update
+#  ----------------------------------------------------------------
+@bp.route("/artists/<int:artist_id>/edit", methods=["GET"])
+def edit_artist(artist_id):
+    # WTForms is only imported by the views rendering or validating a form
+    from forms import ArtistForm
+
+    form = ArtistForm()
+    # TODO-done: populate form with fields from artist with ID <artist_id>
+    # Populating fields in the front-end
+    artist = Artist.query.get(artist_id)
+    form.seeking_description.data = artist.seeking_description
+    form.seeking_venue.data = artist.seeking_venue
+    form.genres.data = artist.genre_names
+    form.state.data = artist.state
+    return render_template("forms/edit_artist.html", form=form, artist=artist)
+
+
+@bp.route("/artists/<int:artist_id>/edit", methods=["POST"])
+def edit_artist_submission(artist_id):
+    # TODO-done: take values from the form submitted, and update existing
+    # artist record with ID <artist_id> using the new attributes
+    try:
+        # mapping data from the request to the artist object
+        artist = Artist.query.get(artist_id)
+        artist.name = request.form["name"]
+        artist.city = request.form["city"]
+        artist.state = request.form["state"]
+        artist.phone = request.form["phone"]
+        tmp_genres = request.form.getlist("genres")
+        artist.genres = Genre.get_or_create_all(tmp_genres)
+        artist.image_link = request.form["image_link"]
+        artist.facebook_link = request.form["facebook_link"]
+        artist.seeking_venue = (
+            True
+            if request.form.get("seeking_venue")
+            and (
+                request.form.get("seeking_venue") == "y"
+                or request.form.get("seeking_venue") == "on"
+            )
+            else False
+        )
+        artist.website = request.form["website"]
+        artist.seeking_description = request.form["seeking_description"]
+        db.session.commit()
+        page_cache.invalidate(page_cache.artist_keys(artist_id))
+        search.refresh_later(Artist)
+    except:
+        db.session.rollback()
+        print(sys.exc_info())
+    finally:
+        db.session.close()
+    return redirect(url_for("artists.show_artist", artist_id=artist_id))
+
+
+#  Create Artist
+#  ----------------------------------------------------------------
+
+
+@bp.route("/artists/create", methods=["GET"])
+def create_artist_form():
+    from forms import ArtistForm
+
+    form = ArtistForm()
+    return render_template("forms/new_artist.html", form=form)
+
+
+@bp.route("/artists/create", methods=["POST"])
+def create_artist_submission():
+    # called upon submitting the new artist listing form
+    # TODO-Done: insert form data as a new Venue record in the db, instead
+    from forms import ArtistForm
+
+    artist_form = ArtistForm(request.form)
+    if not artist_form.validate():
+        # in case the form doesn't contain a valid data
+        print(artist_form.errors)
+        return render_template("errors/500.html"), 500
+    try:
+        # mapping data from the request to the artist columns
+        # TODO-done: modify data to be the data object returned from db insertion
+        values = {
+            field: request.form[field]
+            for field in services.ARTIST_FIELDS
+            if field in request.form
+        }
+        values["seeking_venue"] = request.form.get("seeking_venue") == "y"
+        artist_data = services.create_artist(values, request.form.getlist("genres"))
+    except services.WriteError as error:
+        services.log_write_error(error, "Artist creation failed")
+        # TODO-done: on unsuccessful db insert, flash an error instead.
+        flash(
+            "An error occurred. Artist "
+            + request.form.get("name", "")
+            + " could not be listed."
+        )
+    else:
+        # on successful db insert, flash success
+        flash("Artist " + artist_data["name"] + " was successfully listed!")
+    return render_template("pages/home.html")
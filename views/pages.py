@@ -0,0 +1,46 @@
+from flask import Blueprint, jsonify, render_template
+
+from extensions import metrics
+from models import db
+
+bp = Blueprint("pages", __name__)
+
+
+@bp.route("/")
+def index():
+    return render_template("pages/home.html")
+
+
+#  Monitoring
+#  ----------------------------------------------------------------
+
+
+@bp.route("/stats/pool")
+def pool_stats():
+    # state of the connection pool of this worker
+    pool = db.engine.pool
+    stats = {"pool": type(pool).__name__, "status": pool.status()}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        if hasattr(pool, name):
+            stats[name] = getattr(pool, name)()
+    return jsonify(stats)
+
+
+@bp.route("/metrics")
+def prometheus_metrics():
+    # per endpoint latency, queries and render time of this worker
+    return (
+        metrics.render(),
+        200,
+        {"Content-Type": "text/plain; version=0.0.4"},
+    )
+
+
+@bp.app_errorhandler(404)
+def not_found_error(error):
+    return render_template("errors/404.html"), 404
+
+
+@bp.app_errorhandler(500)
+def server_error(error):
+    return render_template("errors/500.html"), 500
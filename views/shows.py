@@ -0,0 +1,135 @@
+import codecs
+
+import click
+from flask import (
+    Blueprint,
+    abort,
+    current_app,
+    flash,
+    jsonify,
+    render_template,
+    request,
+    stream_template,
+)
+
+import queries
+import services
+import show_import
+
+bp = Blueprint("shows", __name__)
+
+
+#  Shows
+#  ----------------------------------------------------------------
+
+
+@bp.route("/shows")
+def shows():
+    # displays list of shows at /shows
+    # TODO-done: replace with real venues data.
+    #       num_shows should be aggregated based on number of upcoming shows per venue.
+    # keyset pagination on (start_time, id), the cursor comes from the previous page
+    limit = request.args.get("limit", current_app.config["SHOWS_PAGE_SIZE"], type=int)
+    limit = max(1, min(limit, current_app.config["SHOWS_MAX_PAGE_SIZE"]))
+    after = None
+    if request.args.get("after"):
+        try:
+            after = queries.decode_show_cursor(request.args["after"])
+        except ValueError:
+            abort(400)
+    page = queries.ShowsPage(limit, after=after)
+    stream = request.args.get(
+        "stream", "1" if current_app.config["SHOWS_STREAM"] else "0"
+    )
+    if stream == "1":
+        # rendered chunk by chunk, the first bytes reach the client before the
+        # rows of the page have all been fetched
+        return stream_template("pages/shows.html", shows=page, page=page)
+    data = list(page)
+    return render_template("pages/shows.html", shows=data, page=page)
+
+
+@bp.route("/shows/create")
+def create_shows():
+    # renders form. do not touch.
+    # WTForms is only imported by the views rendering or validating a form
+    from forms import ShowForm
+
+    form = ShowForm()
+    return render_template("forms/new_show.html", form=form)
+
+
+@bp.route("/shows/create", methods=["POST"])
+def create_show_submission():
+    # called to create new shows in the db, upon submitting new show listing form
+    # TODO-done: insert form data as a new Show record in the db, instead
+    from forms import ShowForm
+
+    # parsed by the form field, the counters compare it with the time now. A
+    # missing field would fall back to its default, the time forms.py was
+    # imported, so create_show() is given None instead
+    start_time = None
+    if request.form.get("start_time"):
+        start_time = ShowForm(request.form).start_time.data
+    try:
+        services.create_show(
+            request.form.get("venue_id"), request.form.get("artist_id"), start_time
+        )
+    except services.WriteError as error:
+        services.log_write_error(error, "Show creation failed")
+        # TODO-done: on unsuccessful db insert, flash an error instead.
+        flash("An error occurred. Show could not be listed.")
+    else:
+        # on successful db insert, flash success
+        flash("Show was successfully listed!")
+
+    # see: http://flask.pocoo.org/docs/1.0/patterns/flashing/
+    return render_template("pages/home.html")
+
+
+#  Bulk import
+#  ----------------------------------------------------------------
+
+
+@bp.route("/shows/import", methods=["POST"])
+def import_shows_submission():
+    # the schedule is the uploaded "file" or the request body, in the
+    # ?format= (csv or jsonl) and is read while it is received
+    format = request.args.get("format", "csv")
+    if format not in show_import.FORMATS:
+        abort(400)
+    # request.files parses the body as a form, whatever its type: a raw body
+    # sent as application/x-www-form-urlencoded (curl --data-binary) would be
+    # consumed by the parser
+    if request.mimetype == "multipart/form-data":
+        upload = request.files.get("file")
+        if upload is None:
+            return jsonify({"error": "no file uploaded"}), 400
+        body = upload.stream
+    else:
+        body = request.stream
+    report = show_import.import_shows(
+        show_import.read_rows(codecs.iterdecode(body, "utf-8"), format),
+        current_app.config["SHOW_IMPORT_CHUNK_SIZE"],
+    )
+    if not report.inserted and not report.errors:
+        return jsonify({"error": "no show in the schedule"}), 400
+    return jsonify(report.as_dict())
+
+
+@bp.cli.command("import")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--format", type=click.Choice(show_import.FORMATS), default="csv")
+@click.option("--chunk-size", type=int, default=None)
+def import_shows_command(path, format, chunk_size):
+    """Import a schedule of shows: flask shows import schedule.csv"""
+    chunk_size = chunk_size or current_app.config["SHOW_IMPORT_CHUNK_SIZE"]
+    with open(path, newline="", encoding="utf-8") as stream:
+        report = show_import.import_shows(
+            show_import.read_rows(stream, format), chunk_size
+        )
+    for error in report.errors:
+        click.echo("line {line}: {error}".format(**error), err=True)
+    click.echo(
+        "{0} shows imported, {1} rejected".format(report.inserted, len(report.errors))
+    )
@@ -0,0 +1,216 @@
+import sys
+from flask import (
+    Blueprint,
+    abort,
+    current_app,
+    flash,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
+
+from extensions import page_cache
+from helpers import format_search_results
+from models import db, Venue, Artist, Show, Genre
+import counters
+import queries
+import search
+import services
+
+bp = Blueprint("venues", __name__)
+
+
+#  Venues
+#  ----------------------------------------------------------------
+
+
+@bp.route("/venues")
+def venues():
+    # TODO-done: replace with real venues data.
+    # TODO-done: num_shows should be aggregated based on number of upcoming shows per venue.
+    # areas, venues and upcoming shows count are fetched in one grouped query
+    # ?genre= restricts the listing to the venues of that genre
+    # called by the template only when its cached listing is missing
+    areas = lambda: queries.venue_areas(genre=request.args.get("genre"))
+    return render_template("pages/venues.html", areas=areas)
+
+
+@bp.route("/venues/search", methods=["POST"])
+def search_venues():
+    # TODO-done: implement search on artists with partial string search. Ensure it is case-insensitive.
+    # seach for Hop should return "The Musical Hop".
+    # search for "Music" should return "The Musical Hop" and "Park Square Live Music & Coffee"
+
+    search_term = request.form.get("search_term", "")
+    search_term = (
+        search_term.strip()
+    )  # removing the spaces form the beginning and the end
+    # indexed and ranked search, see search.py
+    results = search.search(
+        Venue,
+        search_term,
+        current_app.config["SEARCH_RESULTS_LIMIT"],
+        genre=request.form.get("genre"),
+    )
+    # Format the data to be in the desired format
+    response = format_search_results(results)
+
+    return render_template(
+        "pages/search_venues.html",
+        results=response,
+        search_term=request.form.get("search_term", ""),
+    )
+
+
+@bp.route("/venues/<int:venue_id>")
+def show_venue(venue_id):
+    # shows the venue page with the given venue_id
+    # the rendered page is cached until the venue or one of its shows changes
+    return page_cache.respond("venue", venue_id, lambda: render_venue_page(venue_id))
+
+
+async def show_venue_async(venue_id):
+    # show_venue() with ASYNC_VIEWS, see async_db.py
+    return await page_cache.respond_async(
+        "venue", venue_id, lambda: render_venue_page_async(venue_id)
+    )
+
+
+async def render_venue_page_async(venue_id):
+    data = await queries.entity_page_async(Venue, venue_id)
+    if data is None:
+        abort(404)
+    return render_template("pages/show_venue.html", venue=data)
+
+
+def render_venue_page(venue_id):
+    # TODO-done: replace with real venue data from the venues table, using venue_id
+    # the venue columns, genre names and past and upcoming shows with their
+    # artists, see viewmodels.py
+    data = queries.entity_page(Venue, venue_id)
+    if data is None:
+        abort(404)
+    return render_template("pages/show_venue.html", venue=data)
+
+
+#  Create Venue
+#  ----------------------------------------------------------------
+
+
+@bp.route("/venues/create", methods=["GET"])
+def create_venue_form():
+    # WTForms is only imported by the views rendering or validating a form
+    from forms import VenueForm
+
+    form = VenueForm()
+    return render_template("forms/new_venue.html", form=form)
+
+
+@bp.route("/venues/create", methods=["POST"])
+def create_venue_submission():
+    # TODO-Done: insert form data as a new Venue record in the db, instead
+    try:
+        # TODO-Done: modify data to be the data object returned from db insertion
+        values = {
+            field: request.form[field]
+            for field in services.VENUE_FIELDS
+            if field in request.form
+        }
+        values["seeking_talent"] = request.form.get("seeking_talent") == "y"
+        venue_data = services.create_venue(values, request.form.getlist("genres"))
+    except services.WriteError as error:
+        services.log_write_error(error, "Venue creation failed")
+        # TODO-Done: on unsuccessful db insert, flash an error instead.
+        flash(
+            "An error occurred. Venue "
+            + request.form.get("name", "")
+            + " could not be listed."
+        )
+    else:
+        # on successful db insert, flash success
+        flash("Venue " + venue_data["name"] + " was successfully listed!")
+    # see: http://flask.pocoo.org/docs/1.0/patterns/flashing/
+    return render_template("pages/home.html")
+
+
+@bp.route("/venues/<venue_id>", methods=["DELETE"])
+def delete_venue(venue_id):
+    # TODO-done: Complete this endpoint for taking a venue_id, and using
+    # SQLAlchemy ORM to delete a record. Handle cases where the session commit could fail.
+    try:
+        # the pages listing the venue are known before its shows are deleted
+        cached_pages = page_cache.venue_keys(venue_id)
+        artist_ids = [
+            artist_id
+            for artist_id, in db.session.query(Show.artist_id)
+            .filter(Show.venue_id == venue_id)
+            .distinct()
+        ]
+        # the shows of the venue are deleted by the ON DELETE CASCADE foreign key
+        Venue.query.filter_by(id=venue_id).delete()
+        # in the transaction: a recount lost with a background job would leave
+        # the counters of the artists wrong until "flask counters recount"
+        counters.recount(Artist, Artist.id.in_(artist_ids))
+        db.session.commit()
+        page_cache.invalidate(cached_pages)
+        search.refresh_later(Venue)
+    except:
+        db.session.rollback()
+    finally:
+        db.session.close()
+    # BONUS CHALLENGE: Implement a button to delete a Venue on a Venue Page, have it so that
+    # clicking that button delete it from the db then redirect the user to the homepage
+    return jsonify({"success": True})
+
+
+@bp.route("/venues/<int:venue_id>/edit", methods=["GET"])
+def edit_venue(venue_id):
+    from forms import VenueForm
+
+    form = VenueForm()
+    # TODO-done: populate form with values from venue with ID <venue_id>
+    venue = Venue.query.get(venue_id)
+    form.seeking_description.data = venue.seeking_description
+    form.seeking_talent.data = venue.seeking_talent
+    form.genres.data = venue.genre_names
+    form.state.data = venue.state
+    return render_template("forms/edit_venue.html", form=form, venue=venue)
+
+
+@bp.route("/venues/<int:venue_id>/edit", methods=["POST"])
+def edit_venue_submission(venue_id):
+    # TODO-done: take values from the form submitted, and update existing
+    # venue record with ID <venue_id> using the new attributes
+    venue = Venue.query.get(venue_id)
+    try:
+        venue.name = request.form["name"]
+        venue.city = request.form["city"]
+        venue.state = request.form["state"]
+        venue.address = request.form["address"]
+        venue.phone = request.form["phone"]
+        venue.image_link = request.form["image_link"]
+        venue.facebook_link = request.form["facebook_link"]
+        tmp_genres = request.form.getlist("genres")
+        venue.genres = Genre.get_or_create_all(tmp_genres)
+        venue.website = request.form["website"]
+        venue.seeking_talent = (
+            True
+            if request.form.get("seeking_talent")
+            and (
+                request.form.get("seeking_talent") == "y"
+                or request.form.get("seeking_venue") == "on"
+            )
+            else False
+        )
+        venue.seeking_description = request.form["seeking_description"]
+        db.session.commit()
+        page_cache.invalidate(page_cache.venue_keys(venue_id))
+        search.refresh_later(Venue)
+    except:
+        db.session.rollback()
+        print(sys.exc_info())
+    finally:
+        db.session.close()
+    return redirect(url_for("venues.show_venue", venue_id=venue_id))